@@ -0,0 +1,149 @@
+"""Нагрузочный тест движка опроса на локальной заглушке.
+
+Запуск: python benchmarks/bench_load.py --tenants 500 --duration 30
+Заглушка API Практикума и Telegram (benchmarks/simulator.py) работает
+в отдельном процессе, поэтому CPU и RSS относятся только к боту.
+Печатает JSON: опросов в секунду, перцентили задержки от смены статуса
+до сообщения в Telegram, долю CPU и пиковый RSS.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+from urllib.request import urlopen
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+sys.path.insert(0, BENCHMARKS)
+
+from simulator import API_PATH, make_parser  # noqa: E402
+
+BOT_TOKEN = '123456:bench'
+TOKEN_HEADROOM = 4
+
+
+def start_simulator(argv):
+    """Процесс заглушки и её адрес."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS, 'simulator.py'), *argv],
+        stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def simulator_argv(args):
+    """Параметры заглушки из общих параметров теста."""
+    argv = []
+    for action in make_parser()._actions:
+        value = getattr(args, action.dest)
+        if value is not None:
+            argv += [action.option_strings[0], str(value)]
+    return argv
+
+
+def configure(url, args):
+    """Окружение бота: заглушка вместо API и короткие интервалы опроса.
+
+    Квота токена берётся с запасом TOKEN_HEADROOM над частотой опроса,
+    чтобы замер показывал движок, а не ограничение по умолчанию.
+    """
+    token_rate = TOKEN_HEADROOM * 60 / args.poll_interval
+    os.environ.update({
+        'PRACTICUM_ENDPOINT': url + API_PATH,
+        'RETRY_TIME': str(args.poll_interval),
+        'REVIEWING_RETRY_TIME': str(args.poll_interval),
+        'RETRY_JITTER': '0.1',
+        'REQUESTS_PER_SECOND': str(args.requests_per_second),
+        'TOKEN_REQUESTS_PER_MINUTE': str(token_rate),
+        'TOKEN_BURST': str(TOKEN_HEADROOM),
+        'RESPONSE_CACHE_TTL': '0',
+        'TELEGRAM_GLOBAL_RATE': str(args.telegram_rate),
+    })
+
+
+async def run_for(engine, duration):
+    """Работа движка duration секунд."""
+    try:
+        await asyncio.wait_for(engine.run(), duration)
+    except asyncio.TimeoutError:
+        pass
+
+
+def cpu_seconds():
+    """Процессорное время текущего процесса."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def bench(url, args):
+    """Прогон бота против заглушки; итоговые показатели."""
+    configure(url, args)
+    import telegram
+
+    import homework
+    from response_cache import CachingSession
+    from sender import FAILED, SENT, SendQueue
+    from tenants import Subscriber, Tenant
+    from transport import make_session
+
+    homework.load_settings()
+    now = int(time.time())
+    tenants = [
+        Tenant(f'token-{index:05d}', [Subscriber(index + 1)], now)
+        for index in range(args.tenants)
+    ]
+    session = CachingSession(make_session(
+        homework.HTTP_POOL_SIZE, homework.HTTP_RETRIES,
+        homework.HTTP_BACKOFF), homework.RESPONSE_CACHE_TTL)
+    sender = SendQueue(
+        telegram.Bot(BOT_TOKEN, base_url=url + '/bot'),
+        homework.TELEGRAM_GLOBAL_RATE, homework.TELEGRAM_CHAT_RATE)
+    sender.start()
+    cpu = cpu_seconds()
+    started = time.perf_counter()
+    asyncio.run(run_for(
+        homework.PollEngine(sender, tenants, session), args.duration))
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu
+    sender.stop(timeout=args.drain)
+    with urlopen(url + '/stats') as response:
+        stats = json.load(response)
+    stats.update({
+        'tenants': args.tenants,
+        'seconds': round(elapsed, 1),
+        'polls_per_second': round(stats['api_requests'] / elapsed, 1),
+        'sent': sender.outcomes[SENT],
+        'failed': sender.outcomes[FAILED],
+        'cpu_percent': round(100 * cpu / elapsed, 1),
+        'max_rss_mb': round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, parents=[make_parser()])
+    parser.add_argument('--tenants', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--drain', type=float, default=5,
+                        help='ожидание очереди отправки после опроса, с')
+    parser.add_argument('--poll-interval', type=int, default=1)
+    parser.add_argument('--requests-per-second', type=float, default=1000)
+    parser.add_argument('--telegram-rate', type=float, default=30)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    process, url = start_simulator(simulator_argv(args))
+    try:
+        print(json.dumps(bench(url, args), ensure_ascii=False))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
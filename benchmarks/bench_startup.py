@@ -0,0 +1,98 @@
+"""Время холодного запуска бота и бюджет импорта.
+
+Запуск: python benchmarks/bench_startup.py --runs 5 --budget-ms 150
+Каждый замер - отдельный процесс python -X importtime -c 'import homework'.
+Печатает JSON: медиану собственного импорта homework, самые дорогие
+модули и время до отказа check_tokens без токенов. Код возврата 1,
+если медиана превышает бюджет или при импорте загружены сетевые
+библиотеки: они должны подгружаться только при первом запросе.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 150
+HEAVY = ('telegram', 'requests', 'urllib3')
+PROBE = (
+    'import sys, homework, json; '
+    'print(json.dumps(sorted({0!r} & set(sys.modules))))'
+)
+
+
+def clean_env():
+    """Окружение без токенов: check_tokens должен отказать сразу."""
+    env = {key: value for key, value in os.environ.items()
+           if not key.endswith('_TOKEN') and key != 'TENANTS_FILE'}
+    env['LOG_FILE'] = os.devnull
+    return env
+
+
+def import_times(code='import homework'):
+    """Накопленное время импорта каждого модуля в микросекундах."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, env=clean_env(), capture_output=True, text=True,
+        check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_heavy():
+    """Сетевые библиотеки, загруженные простым импортом homework."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(set(HEAVY))],
+        cwd=ROOT, env=clean_env(), capture_output=True, text=True,
+        check=True)
+    return json.loads(result.stdout)
+
+
+def failed_start_ms():
+    """Время процесса, которому check_tokens отказал в запуске."""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'homework.py'], cwd=ROOT, env=clean_env(),
+        capture_output=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    runs = [import_times() for _ in range(args.runs)]
+    homework_ms = statistics.median(
+        times['homework'] for times in runs) / 1000
+    last = runs[-1]
+    interpreter = import_times('pass')
+    top = sorted(
+        (name for name in last
+         if name != 'homework' and name not in interpreter),
+        key=last.get, reverse=True)[:args.top]
+    heavy = loaded_heavy()
+    report = {
+        'import_homework_ms': round(homework_ms, 1),
+        'budget_ms': args.budget_ms,
+        'failed_start_ms': round(statistics.median(
+            failed_start_ms() for _ in range(args.runs)), 1),
+        'heavy_loaded': heavy,
+        'top_modules_ms': {name: round(last[name] / 1000, 1) for name in top},
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if heavy or homework_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
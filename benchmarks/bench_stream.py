@@ -0,0 +1,91 @@
+"""Пиковая память разбора длинной истории работ: json против потока.
+
+Запуск: python benchmarks/bench_stream.py --records 200000
+Каждый способ разбора выполняется в отдельном процессе, чтобы пиковый
+RSS одного не влиял на другой.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream import HomeworkStream  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_payload(records):
+    """Тело ответа API с records работами."""
+    homeworks = [{
+        'id': index,
+        'status': 'approved',
+        'homework_name': f'student__hw{index:06d}_final.zip',
+        'reviewer_comment': 'Всё нравится' * 8,
+        'date_updated': '2021-10-12T14:40:57Z',
+        'lesson_name': 'Итоговый проект',
+    } for index in range(records)]
+    return json.dumps(
+        {'homeworks': homeworks, 'current_date': 1634074965},
+        ensure_ascii=False).encode()
+
+
+def chunks(payload):
+    """Куски тела, как их отдаёт response.iter_content()."""
+    for start in range(0, len(payload), CHUNK_SIZE):
+        yield payload[start:start + CHUNK_SIZE]
+
+
+def parse_json(payload):
+    """Текущий путь: весь документ через json.loads."""
+    answer = json.loads(b''.join(chunks(payload)))
+    return sum(1 for homework in answer['homeworks']
+               if homework['status'] == 'reviewing')
+
+
+def parse_stream(payload):
+    """Потоковый путь: работы по одной."""
+    return sum(1 for homework in HomeworkStream(chunks(payload))
+               if homework['status'] == 'reviewing')
+
+
+def run_mode(mode, records):
+    """Замер одного способа в текущем процессе."""
+    payload = make_payload(records)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    started = time.perf_counter()
+    {'json': parse_json, 'stream': parse_stream}[mode](payload)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'mode': mode,
+        'seconds': round(elapsed, 3),
+        'peak_alloc_mb': round(peak / 2 ** 20, 1),
+        'rss_growth_mb': round((rss - baseline) / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--mode', choices=('json', 'stream'))
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.records)
+        return
+    for mode in ('json', 'stream'):
+        subprocess.run([
+            sys.executable, __file__,
+            '--mode', mode, '--records', str(args.records)], check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""Локальная заглушка API Практикума и Bot API Telegram для нагрузки.
+
+Запуск: python benchmarks/simulator.py --port 8080 --latency 0.05
+Первой строкой в stdout печатается адрес сервера. Заглушка отвечает
+на GET по пути API Практикума и на POST /bot<token>/sendMessage,
+а GET /stats возвращает счётчики и задержку доставки уведомлений:
+от смены статуса работы до прихода сообщения о ней в Telegram.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+API_PATH = '/api/user_api/homework_statuses/'
+STATUSES = ('reviewing', 'approved', 'rejected')
+QUOTED = re.compile(r'"([^"]+)"')
+
+
+def percentile(values, share):
+    """Перцентиль share (0..1) отсортированного списка; None для пустого."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+class Simulation:
+    """Состояние заглушки: работы каждого токена и счётчики."""
+
+    def __init__(self, homeworks=3, change_rate=0.1, seed=None):
+        """homeworks работ на токен, change_rate - доля смен статуса."""
+        self.homeworks = homeworks
+        self.change_rate = change_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.works = {}
+        self.changed_at = {}
+        self.latencies = []
+        self.counters = dict.fromkeys((
+            'api_requests', 'api_errors', 'api_throttled',
+            'telegram_messages', 'telegram_throttled'), 0)
+
+    def count(self, name):
+        """Увеличение счётчика name."""
+        with self.lock:
+            self.counters[name] += 1
+
+    def chance(self, rate):
+        """Случайное событие с вероятностью rate."""
+        with self.lock:
+            return self.random.random() < rate
+
+    def answer(self, token):
+        """Ответ API для токена; иногда меняет статус одной работы."""
+        now = time.time()
+        with self.lock:
+            works = self.works.get(token)
+            if works is None:
+                prefix = token.replace('-', '_')
+                works = self.works[token] = [{
+                    'id': index,
+                    'homework_name': f'{prefix}_hw{index:02d}.zip',
+                    'status': 'reviewing',
+                    'reviewer_comment': '',
+                    'date_updated': time.strftime(
+                        '%Y-%m-%dT%H:%M:%SZ', time.gmtime(now)),
+                    'lesson_name': 'Нагрузочный тест',
+                } for index in range(self.homeworks)]
+            elif self.random.random() < self.change_rate:
+                work = self.random.choice(works)
+                work['status'] = self.random.choice(
+                    [status for status in STATUSES
+                     if status != work['status']])
+                work['date_updated'] = time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))
+                self.changed_at[work['homework_name']] = now
+            return {'homeworks': list(works), 'current_date': int(now)}
+
+    def delivered(self, text):
+        """Учёт сообщения Telegram: задержка для каждой названной работы."""
+        now = time.time()
+        with self.lock:
+            self.counters['telegram_messages'] += 1
+            for name in QUOTED.findall(text):
+                changed_at = self.changed_at.pop(name, None)
+                if changed_at is not None:
+                    self.latencies.append(now - changed_at)
+
+    def stats(self):
+        """Счётчики и перцентили задержки уведомлений, в секундах."""
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = dict(self.counters)
+        stats['notifications'] = len(latencies)
+        for name, share in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            value = percentile(latencies, share)
+            stats[f'latency_{name}'] = (
+                None if value is None else round(value, 3))
+        return stats
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов к обеим заглушкам."""
+
+    def reply(self, status, data, headers=()):
+        """Ответ JSON."""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def pause(self, latency):
+        """Задержка ответа latency с разбросом ±50%."""
+        if latency:
+            time.sleep(latency * random.uniform(0.5, 1.5))
+
+    def do_GET(self):
+        """API Практикума и /stats."""
+        url = urlparse(self.path)
+        if url.path == '/stats':
+            self.reply(200, self.server.simulation.stats())
+            return
+        if url.path != API_PATH:
+            self.send_error(404)
+            return
+        options = self.server.options
+        simulation = self.server.simulation
+        simulation.count('api_requests')
+        self.pause(options.latency)
+        authorization = self.headers.get('Authorization', '')
+        if not authorization.startswith('OAuth '):
+            self.reply(401, {'code': 'not_authenticated'})
+            return
+        if simulation.chance(options.throttle_rate):
+            simulation.count('api_throttled')
+            self.reply(429, {'error': 'throttled'}, [('Retry-After', '1')])
+            return
+        if simulation.chance(options.error_rate):
+            simulation.count('api_errors')
+            self.reply(500, {'error': 'internal'})
+            return
+        self.reply(200, simulation.answer(authorization[len('OAuth '):]))
+
+    def do_POST(self):
+        """Метод sendMessage Bot API."""
+        if not self.path.endswith('/sendMessage'):
+            self.send_error(404)
+            return
+        options = self.server.options
+        simulation = self.server.simulation
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length) or b'{}')
+        self.pause(options.telegram_latency)
+        if simulation.chance(options.telegram_throttle_rate):
+            simulation.count('telegram_throttled')
+            self.reply(429, {
+                'ok': False,
+                'error_code': 429,
+                'description': 'Too Many Requests: retry after 1',
+                'parameters': {'retry_after': 1},
+            })
+            return
+        simulation.delivered(data.get('text', ''))
+        self.reply(200, {'ok': True, 'result': {
+            'message_id': simulation.counters['telegram_messages'],
+            'date': int(time.time()),
+            'chat': {'id': int(data.get('chat_id', 0)), 'type': 'private'},
+            'text': data.get('text', ''),
+        }})
+
+    def log_message(self, format, *args):
+        """Без журнала запросов: он искажает замеры."""
+
+
+def start_simulator(options, host='127.0.0.1'):
+    """Запуск заглушки в фоновом потоке по параметрам options."""
+    server = ThreadingHTTPServer((host, options.port), SimulatorHandler)
+    server.daemon_threads = True
+    server.options = options
+    server.simulation = Simulation(
+        options.homeworks, options.change_rate, options.seed)
+    threading.Thread(
+        target=server.serve_forever, name='simulator', daemon=True).start()
+    return server
+
+
+def make_parser():
+    """Параметры заглушки; их же принимает нагрузочный тест."""
+    parser = argparse.ArgumentParser(description=__doc__, add_help=False)
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='задержка API Практикума, с')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='доля ответов 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='доля ответов 429 API Практикума')
+    parser.add_argument('--homeworks', type=int, default=3,
+                        help='работ в каждом ответе')
+    parser.add_argument('--change-rate', type=float, default=0.1,
+                        help='доля опросов со сменой статуса')
+    parser.add_argument('--telegram-latency', type=float, default=0.01,
+                        help='задержка Bot API, с')
+    parser.add_argument('--telegram-throttle-rate', type=float, default=0.0,
+                        help='доля ответов 429 Bot API')
+    parser.add_argument('--seed', type=int)
+    return parser
+
+
+def main():
+    parser = argparse.ArgumentParser(parents=[make_parser()])
+    server = start_simulator(parser.parse_args())
+    host, port = server.server_address
+    print(f'http://{host}:{port}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
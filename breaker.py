@@ -0,0 +1,94 @@
+import time
+from collections import deque
+
+from exceptions import CircuitOpen
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+CIRCUIT_OPEN = 'API Практикума недоступно, запросы приостановлены на {0} с.'
+
+
+class CircuitBreaker:
+    """Автомат отключения запросов к API при массовых сбоях.
+
+    В закрытом состоянии запросы идут как обычно. Если среди последних
+    window запросов доля сбоев достигла failure_rate, автомат
+    размыкается и на reset_timeout секунд запросы сразу получают
+    CircuitOpen. Затем пропускается один пробный запрос: удача
+    замыкает автомат, сбой снова размыкает.
+    """
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=5,
+                 reset_timeout=60, clock=time.monotonic):
+        """Замкнутый автомат без истории запросов."""
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.results = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = None
+        self.probing = False
+
+    def configure(self, failure_rate, window, reset_timeout):
+        """Новые пороги без сброса состояния и последних итогов."""
+        self.failure_rate = failure_rate
+        self.reset_timeout = reset_timeout
+        if window != self.results.maxlen:
+            self.results = deque(self.results, maxlen=window)
+
+    def open(self):
+        """Размыкание автомата."""
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.probing = False
+        self.results.clear()
+
+    def close(self):
+        """Замыкание автомата."""
+        self.state = CLOSED
+        self.probing = False
+        self.results.clear()
+
+    def remaining(self):
+        """Сколько секунд осталось до пробного запроса."""
+        return max(self.reset_timeout - (self.clock() - self.opened_at), 0)
+
+    def before_call(self):
+        """Разрешение запроса; при разомкнутом автомате - CircuitOpen."""
+        if self.state == OPEN:
+            if self.remaining() > 0:
+                raise CircuitOpen(CIRCUIT_OPEN.format(int(self.remaining())))
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probing:
+                raise CircuitOpen(CIRCUIT_OPEN.format(0))
+            self.probing = True
+
+    def record_success(self):
+        """Учёт запроса, на который API ответило.
+
+        Итоги запросов, начатых до размыкания и завершившихся уже
+        при разомкнутом автомате, не учитываются: иначе поздние сбои
+        снова размыкали бы его и отодвигали пробный запрос.
+        """
+        if self.state == OPEN:
+            return
+        if self.state == HALF_OPEN:
+            self.close()
+            return
+        self.results.append(True)
+
+    def record_failure(self):
+        """Учёт сбоя соединения или ответа 5xx; при OPEN не учитывается."""
+        if self.state == OPEN:
+            return
+        if self.state == HALF_OPEN:
+            self.open()
+            return
+        self.results.append(False)
+        failures = self.results.count(False)
+        if (len(self.results) >= self.min_calls
+                and failures / len(self.results) >= self.failure_rate):
+            self.open()
@@ -0,0 +1,133 @@
+import glob
+import json
+import logging
+import os
+import tempfile
+
+from logs import Lazy
+
+CHECKPOINT_LOADED = 'Контрольная точка загружена: {0} подписчиков.'
+CHECKPOINT_BROKEN = 'Контрольная точка {0} повреждена: {1}.'
+
+logger = logging.getLogger(__name__)
+
+
+def fsync_dir(path):
+    """Сброс на диск записи каталога после переименования."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    descriptor = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def atomic_write_json(path, data):
+    """Атомарная запись JSON: временный файл, fsync и rename."""
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    fsync_dir(directory)
+
+
+def read_checkpoint(path):
+    """Состояние из файла; повреждённый файл не мешает запуску."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError as error:
+        logger.error(Lazy(CHECKPOINT_BROKEN, path, error))
+        return {}
+    logger.info(Lazy(CHECKPOINT_LOADED, len(data)))
+    return data
+
+
+def partition_path(path, shard):
+    """Файл раздела контрольной точки шарда shard."""
+    return f'{path}.{shard}'
+
+
+def load_partitions(path):
+    """Слияние общего файла path и разделов path.<shard>.
+
+    Для каждого токена берётся состояние с самым поздним current_date.
+    """
+    data = {}
+    paths = [path] + sorted(glob.glob(glob.escape(path) + '.*[0-9]'))
+    for part in paths:
+        for key, state in read_checkpoint(part).items():
+            saved = data.get(key)
+            if saved is None or (
+                    state.get('current_date', 0)
+                    > saved.get('current_date', 0)):
+                data[key] = state
+    return data
+
+
+class Checkpoint:
+    """Контрольная точка: current_date и последние статусы подписчиков."""
+
+    def __init__(self, path):
+        """Чтение сохранённого состояния, если файл уже есть."""
+        self.path = path
+        self.data = self.load()
+
+    def load(self):
+        """Загрузка состояния вместе с разделами шардов.
+
+        Бот мог работать с шардами до перезапуска без них: по каждому
+        токену берётся самая поздняя отметка из файла и разделов.
+        """
+        return load_partitions(self.path)
+
+    def restore(self, tenants, default_timestamp):
+        """Продолжение опроса с сохранённых отметок времени."""
+        for tenant in tenants:
+            state = self.data.get(tenant.key, {})
+            tenant.timestamp = state.get('current_date', default_timestamp)
+            tenant.statuses.update(state.get('statuses', {}))
+
+    def save(self, tenants):
+        """Атомарное сохранение состояния всех подписчиков."""
+        for tenant in tenants:
+            self.data[tenant.key] = {
+                'current_date': tenant.timestamp,
+                'statuses': tenant.statuses.to_dict(),
+            }
+        atomic_write_json(self.path, self.data)
+
+
+class PartitionCheckpoint(Checkpoint):
+    """Раздел контрольной точки одного процесса-шарда.
+
+    Каждый шард пишет только свой файл path.<shard>, а читает все
+    разделы и общий файл path: после изменения числа шардов токен
+    продолжает с самой поздней отметки, где бы она ни была сохранена.
+    """
+
+    def __init__(self, path, shard):
+        """Раздел шарда shard контрольной точки path."""
+        self.base = path
+        super().__init__(partition_path(path, shard))
+
+    def load(self):
+        """Состояние из всех разделов."""
+        return load_partitions(self.base)
+
+    def restore(self, tenants, default_timestamp):
+        """Восстановление; в разделе остаются только токены шарда."""
+        super().restore(tenants, default_timestamp)
+        keys = {tenant.key for tenant in tenants}
+        self.data = {
+            key: state for key, state in self.data.items() if key in keys}
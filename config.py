@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+
+from exceptions import ConfigError
+from logs import Lazy
+
+CONFIG_TYPE_FAIL = 'Файл настроек должен содержать объект JSON. Тип - {0}'
+CONFIG_JSON_FAIL = 'Файл настроек {0} не разобран: {1}.'
+CONFIG_UNKNOWN = 'Эти настройки нельзя менять на ходу: {0}.'
+CONFIG_INVALID = 'Недопустимое значение {0}={1!r}: {2}.'
+CONFIG_ORDER_FAIL = (
+    'Нужно REVIEWING_RETRY_TIME <= RETRY_TIME <= MAX_RETRY_TIME, '
+    'получено {0}, {1}, {2}.'
+)
+CONFIG_IDLE_FAIL = (
+    'Нужно {0} > MAX_RETRY_TIME * (1 + RETRY_JITTER), '
+    'получено {1} <= {2}: обычная пауза опроса сочтётся простоем.'
+)
+CONFIG_RELOADED = 'Настройки из {0} применены.'
+CONFIG_REJECTED = 'Настройки из {0} не применены, остаются прежние: {1}'
+NOT_POSITIVE = 'нужно число больше нуля'
+NEGATIVE = 'нужно неотрицательное число'
+NOT_SHARE = 'нужно число от 0 до 1'
+NOT_URL = 'нужен адрес http(s)'
+
+logger = logging.getLogger(__name__)
+
+
+def number(parse, minimum=0, strict=True, maximum=None, message=NOT_POSITIVE):
+    """Проверка числа: parse(value) в заданных границах."""
+    def validate(value):
+        if isinstance(value, bool):
+            raise TypeError(message)
+        value = parse(value)
+        if value < minimum or (strict and value == minimum) or (
+                maximum is not None and value > maximum):
+            raise ValueError(message)
+        return value
+    return validate
+
+
+def url(value):
+    """Проверка адреса API."""
+    if not isinstance(value, str) or not value.startswith(
+            ('http://', 'https://')):
+        raise ValueError(NOT_URL)
+    return value
+
+
+positive_int = number(int)
+positive_float = number(float)
+non_negative = number(float, strict=False, message=NEGATIVE)
+non_negative_int = number(int, strict=False, message=NEGATIVE)
+share = number(float, strict=False, maximum=1, message=NOT_SHARE)
+
+SETTINGS = {
+    'RETRY_TIME': positive_int,
+    'REVIEWING_RETRY_TIME': positive_int,
+    'MAX_RETRY_TIME': positive_int,
+    'RETRY_JITTER': share,
+    'REQUESTS_PER_SECOND': positive_float,
+    'TOKEN_REQUESTS_PER_MINUTE': positive_float,
+    'BREAKER_FAILURE_RATE': share,
+    'BREAKER_WINDOW': positive_int,
+    'BREAKER_RESET_TIMEOUT': positive_int,
+    'TELEGRAM_GLOBAL_RATE': positive_float,
+    'TELEGRAM_CHAT_RATE': positive_float,
+    'TIMEOUT': positive_float,
+    'RESPONSE_CACHE_TTL': non_negative,
+    'STREAM_AFTER': positive_int,
+    'CATCHUP_AFTER': positive_int,
+    'ENDPOINT': url,
+}
+STARTUP_SETTINGS = {
+    'SHARDS': positive_int,
+    'CONFIG_POLL_INTERVAL': positive_float,
+    'TOKEN_BURST': positive_int,
+    'CHECKPOINT_INTERVAL': positive_int,
+    'LOG_MAX_BYTES': positive_int,
+    'LOG_BACKUP_COUNT': non_negative_int,
+    'LOG_SAMPLE_INTERVAL': non_negative,
+    'POLL_CONCURRENCY': positive_int,
+    'HTTP_POOL_SIZE': positive_int,
+    'HTTP_RETRIES': non_negative_int,
+    'HTTP_BACKOFF': non_negative,
+}
+
+
+def check_relations(values):
+    """Согласованность настроек между собой.
+
+    CATCHUP_AFTER и STREAM_AFTER должны быть длиннее самой долгой паузы
+    опроса с разбросом, иначе обычный опрос пойдёт в режиме догона.
+    """
+    intervals = (values['REVIEWING_RETRY_TIME'], values['RETRY_TIME'],
+                 values['MAX_RETRY_TIME'])
+    if list(intervals) != sorted(intervals):
+        raise ConfigError(CONFIG_ORDER_FAIL.format(*intervals))
+    longest = values['MAX_RETRY_TIME'] * (1 + values.get('RETRY_JITTER', 0))
+    for name in ('CATCHUP_AFTER', 'STREAM_AFTER'):
+        if name in values and values[name] <= longest:
+            raise ConfigError(
+                CONFIG_IDLE_FAIL.format(name, values[name], longest))
+
+
+def validate(data, defaults):
+    """Проверенные настройки: defaults, перекрытые значениями data.
+
+    Ключ, пропавший из файла, возвращается к значению из defaults.
+    Значения defaults из окружения проверяются так же, как из файла;
+    любая ошибка отклоняет весь набор целиком.
+    """
+    if not isinstance(data, dict):
+        raise ConfigError(CONFIG_TYPE_FAIL.format(type(data)))
+    unknown = sorted(set(data) - set(SETTINGS))
+    if unknown:
+        raise ConfigError(CONFIG_UNKNOWN.format(unknown))
+    values = convert(dict(defaults, **data), SETTINGS)
+    check_relations(values)
+    return values
+
+
+def convert(data, validators):
+    """Значения data, приведённые валидаторами validators по имени."""
+    values = {}
+    for name, value in data.items():
+        try:
+            values[name] = validators[name](value)
+        except (TypeError, ValueError) as error:
+            raise ConfigError(CONFIG_INVALID.format(name, value, error))
+    return values
+
+
+def validate_startup(data):
+    """Проверка настроек, которые читаются только при запуске."""
+    return convert(data, STARTUP_SETTINGS)
+
+
+def load_config(path, defaults):
+    """Чтение и проверка файла настроек JSON."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+    except ValueError as error:
+        raise ConfigError(CONFIG_JSON_FAIL.format(path, error))
+    return validate(data, defaults)
+
+
+class ConfigWatcher:
+    """Отслеживание файла настроек по mtime и размеру.
+
+    check() вызывается из цикла событий: новые настройки проверяются
+    целиком и передаются в apply(values) одним вызовом между опросами,
+    а файл с ошибкой оставляет прежние настройки.
+    """
+
+    def __init__(self, path, defaults, apply):
+        """Файл path считается уже применённым при создании."""
+        self.path = path
+        self.defaults = defaults
+        self.apply = apply
+        self.signature = self.stat()
+
+    def stat(self):
+        """Отпечаток файла; None, если файла нет."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """Применение изменившегося файла; True, если применён."""
+        signature = self.stat()
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        if signature is None:
+            return False
+        try:
+            values = load_config(self.path, self.defaults)
+        except (OSError, ConfigError) as error:
+            logger.error(Lazy(CONFIG_REJECTED, self.path, error))
+            return False
+        self.apply(values)
+        logger.info(Lazy(CONFIG_RELOADED, self.path))
+        return True
@@ -2,6 +2,26 @@ class WrongStatus(Exception):
     """Вызывается при неверном статусе."""
     pass
 
+class ServerError(WrongStatus):
+    """Вызывается при ответе API с кодом 5xx."""
+    pass
+
+class Throttled(WrongStatus):
+    """Вызывается, когда API ограничивает частоту запросов (429)."""
+
+    def __init__(self, message, retry_after=None):
+        """retry_after - пауза из заголовка Retry-After, в секундах."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class JsonError(Exception):
     """Вызывается при ошибках JSON"""
-    pass
\ No newline at end of file
+    pass
+
+class CircuitOpen(Exception):
+    """Вызывается, когда запросы к API приостановлены после сбоев."""
+    pass
+
+class ConfigError(Exception):
+    """Вызывается при ошибках в файле настроек."""
+    pass
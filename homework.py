@@ -1,34 +1,95 @@
+import asyncio
+import functools
 import logging
 import os
+import signal
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-import telegram
 from dotenv import load_dotenv
 
-from exceptions import JsonError, WrongStatus
+from breaker import CLOSED, CircuitBreaker
+from checkpoint import Checkpoint, PartitionCheckpoint, load_partitions
+from config import (SETTINGS, STARTUP_SETTINGS, ConfigWatcher, load_config,
+                    validate, validate_startup)
+from exceptions import (CircuitOpen, JsonError, ServerError, Throttled,
+                        WrongStatus)
+from logs import Lazy, Redactor, setup_logging
+from messages import (DEFAULT_LOCALE, render, render_digest, render_verdict,
+                      table, verdict_text)
+from metrics import Gauge, Histogram, start_metrics_server, timed
+from outbox import Outbox, delivery_key
+from ratelimit import QuotaManager
+from records import Homework, as_record, collapse
+from response_cache import CachingSession
+from scheduler import AdaptivePolicy, DeadlineQueue
+from shards import Supervisor, select_shard
+from sender import MESSAGE_LIMIT, SEND_SECONDS, SendQueue
+from stream import HomeworkStream
+from tenants import Subscriber, Tenant, load_tenants
+from transport import make_session
+from webhook import start_webhook
 
 load_dotenv()
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TENANTS_FILE = os.getenv('TENANTS_FILE')
+CHECKPOINT_FILE = os.getenv('CHECKPOINT_FILE')
+OUTBOX_FILE = os.getenv('OUTBOX_FILE')
+CONFIG_FILE = os.getenv('CONFIG_FILE')
+# Числовые настройки читаются строками: приводит и проверяет их
+# load_settings при запуске, а до этого в них значения по умолчанию.
+CONFIG_POLL_INTERVAL = os.getenv('CONFIG_POLL_INTERVAL', 5)
+SHARDS = os.getenv('SHARDS', 1)
 
 TOKENS = {
     'PRACTICUM_TOKEN': PRACTICUM_TOKEN,
     'TELEGRAM_TOKEN': TELEGRAM_TOKEN,
     'TELEGRAM_CHAT_ID': TELEGRAM_CHAT_ID
 }
-RETRY_TIME = 600
-TIMEOUT = 10
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+RETRY_TIME = os.getenv('RETRY_TIME', 600)
+REVIEWING_RETRY_TIME = os.getenv('REVIEWING_RETRY_TIME', 60)
+MAX_RETRY_TIME = os.getenv('MAX_RETRY_TIME', 3600)
+RETRY_JITTER = os.getenv('RETRY_JITTER', 0.1)
+REQUESTS_PER_SECOND = os.getenv('REQUESTS_PER_SECOND', 5)
+TOKEN_REQUESTS_PER_MINUTE = os.getenv('TOKEN_REQUESTS_PER_MINUTE', 6)
+TOKEN_BURST = os.getenv('TOKEN_BURST', 2)
+CHECKPOINT_INTERVAL = os.getenv('CHECKPOINT_INTERVAL', 60)
+SENDER_STOP_TIMEOUT = 10
+BREAKER_FAILURE_RATE = os.getenv('BREAKER_FAILURE_RATE', 0.5)
+BREAKER_WINDOW = os.getenv('BREAKER_WINDOW', 20)
+BREAKER_RESET_TIMEOUT = os.getenv('BREAKER_RESET_TIMEOUT', 60)
+BREAKER_FAILURES = (ConnectionError, ServerError)
+QUIET_FAILURES = (CircuitOpen, Throttled)
+WEBHOOK_PORT = os.getenv('WEBHOOK_PORT')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')
+METRICS_PORT = os.getenv('METRICS_PORT')
+LOG_FILE = os.getenv('LOG_FILE', __file__ + '.log')
+LOG_MAX_BYTES = os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024)
+LOG_BACKUP_COUNT = os.getenv('LOG_BACKUP_COUNT', 5)
+LOG_SAMPLE_INTERVAL = os.getenv('LOG_SAMPLE_INTERVAL', 600)
+TELEGRAM_GLOBAL_RATE = os.getenv('TELEGRAM_GLOBAL_RATE', 30)
+TELEGRAM_CHAT_RATE = os.getenv('TELEGRAM_CHAT_RATE', 1)
+TIMEOUT = os.getenv('TIMEOUT', 10)
+POLL_CONCURRENCY = os.getenv('POLL_CONCURRENCY', 32)
+HTTP_POOL_SIZE = os.getenv('HTTP_POOL_SIZE', POLL_CONCURRENCY)
+HTTP_RETRIES = os.getenv('HTTP_RETRIES', 3)
+HTTP_BACKOFF = os.getenv('HTTP_BACKOFF', 0.5)
+RESPONSE_CACHE_TTL = os.getenv('RESPONSE_CACHE_TTL', 30)
+STREAM_AFTER = os.getenv('STREAM_AFTER', 86400)
+CATCHUP_AFTER = os.getenv('CATCHUP_AFTER', 2 * 3600)
+STREAM_CHUNK_SIZE = 64 * 1024
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/')
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+CONFIG_DEFAULTS = {name: globals()[name] for name in SETTINGS}
 
-VERDICTS = {
-    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
-    'reviewing': 'Работа взята на проверку ревьюером.',
-    'rejected': 'Работа проверена: у ревьюера есть замечания.'
-}
+VERDICTS = table(DEFAULT_LOCALE)['verdicts']
 SERVER_ERROR = 'Ошибка сервера. {0}, URL{1},Headers{2}, Params{3}, Timeout{4}'
 MSG_SUCCESS = 'Сообщение {0} отправлено!'
 MSG_FAIL = 'Сообщение {0} не отправлено: {1}.'
@@ -36,48 +97,132 @@ RESPONSE_KEY_FAIL = 'Ключ homeworks не найден!'
 RESPONSE_TYPE_FAIL = 'Неправильный тип для homeworks. Тип - {0}'
 EMPTY_LIST = 'Список работ пуст.'
 JSON_ERROR = 'Отказ от обслуживания. {0}, {1}, {2}, {3}, {4}'
-VERDICT = 'Изменился статус проверки работы "{0}"-{1}'
-STATUS_FAIL = 'Статус {0} не найден.'
+VERDICT = table(DEFAULT_LOCALE)['verdict']
 MISSING_TOKEN = 'Нет токенов: {0}.'
 CHECK_TOKENS_ERROR = 'Запуск программы невозможен.'
-PROGRAMM_ERROR = 'Сбой в работе программы: {0}'
+PROGRAMM_ERROR = table(DEFAULT_LOCALE)['program_error']
+TENANTS_LOADED = 'Загружено подписчиков: {0}.'
 logger = logging.getLogger(__name__)
-logger.addHandler(logging.StreamHandler())
+API_SECONDS = Histogram(
+    'homework_api_request_seconds', 'Запросы к API Практикума.',
+    ('outcome',))
+PROCESS_SECONDS = Histogram(
+    'homework_process_seconds', 'Разбор ответа API.', ('stage',))
+LOOP_LAG_SECONDS = Histogram(
+    'homework_loop_lag_seconds', 'Опоздание опроса относительно срока.')
 
 
-def send_message(bot, message):
-    """Отправка результатов пользователю."""
+def send_to_chat(bot, chat_id, message):
+    """Отправка сообщения в указанный чат."""
+    import telegram
+
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logger.info(MSG_SUCCESS.format(message))
+        with timed(SEND_SECONDS):
+            bot.send_message(chat_id, message)
+        logger.info(Lazy(MSG_SUCCESS, message))
+        return True
     except telegram.TelegramError as error:
-        logger.exception(MSG_FAIL.format(message, error))
+        logger.exception(Lazy(MSG_FAIL, message, error))
+        return False
 
 
-def get_api_answer(current_timestamp):
-    """Запрос API Практикума."""
-    params = {'from_date': current_timestamp}
+def send_message(bot, message):
+    """Отправка результатов пользователю."""
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def retry_after_of(response):
+    """Пауза из заголовка Retry-After в секундах; None, если её нет."""
+    value = response.headers.get('Retry-After', '')
+    return int(value) if value.isdigit() else None
+
+
+def call_api(headers, params, session=None, **kwargs):
+    """HTTP-запрос к API Практикума с проверкой статуса ответа.
+
+    requests импортируется при первом запросе, а не при запуске:
+    check_tokens и загрузка настроек его не ждут.
+    """
+    import requests
+
+    if session is None:
+        session = requests
     try:
-        response = requests.get(ENDPOINT,
-                                headers=HEADERS,
-                                params=params,
-                                timeout=TIMEOUT)
+        response = session.get(ENDPOINT,
+                               headers=headers,
+                               params=params,
+                               timeout=TIMEOUT,
+                               **kwargs)
     except requests.RequestException as e:
         raise ConnectionError(SERVER_ERROR.format(
-            e, ENDPOINT, HEADERS, params, TIMEOUT))
+            e, ENDPOINT, headers, params, TIMEOUT))
+    if response.status_code == requests.codes.too_many_requests:
+        raise Throttled(SERVER_ERROR.format(
+            response.status_code, ENDPOINT, headers, params, TIMEOUT),
+            retry_after_of(response))
+    if response.status_code >= requests.codes.server_error:
+        raise ServerError(SERVER_ERROR.format(
+            response.status_code, ENDPOINT, headers, params, TIMEOUT))
     if response.status_code != requests.codes.ok:
         raise WrongStatus(SERVER_ERROR.format(
-            response.status_code, ENDPOINT, HEADERS, params, TIMEOUT))
-    answer = response.json()
+            response.status_code, ENDPOINT, headers, params, TIMEOUT))
+    return response
+
+
+def check_answer(answer, headers, params):
+    """Проверка ответа API на ключи ошибок code и error."""
     if 'code' in answer:
         raise JsonError(JSON_ERROR.format(
-            answer['code'], ENDPOINT, HEADERS, params, TIMEOUT))
+            answer['code'], ENDPOINT, headers, params, TIMEOUT))
     if 'error' in answer:
         raise JsonError(JSON_ERROR.format(
-            answer['error'], ENDPOINT, HEADERS, params, TIMEOUT))
+            answer['error'], ENDPOINT, headers, params, TIMEOUT))
+
+
+def request_api(headers, current_timestamp, session=None):
+    """Запрос API Практикума с заголовками подписчика.
+
+    session - сессия с пулом соединений; по умолчанию модуль requests.
+    """
+    params = {'from_date': current_timestamp}
+    answer = call_api(headers, params, session).json()
+    check_answer(answer, headers, params)
     return answer
 
 
+def stream_api(headers, current_timestamp, session=None, keep=None):
+    """Запрос API с потоковым разбором ответа.
+
+    Работы разбираются по одной, от каждой остаётся только последняя
+    по date_updated запись, и уже она проверяется фильтром keep.
+    Память растёт с числом работ, а не с длиной истории, а старые
+    записи работы не сравниваются с известным статусом.
+    """
+    params = {'from_date': current_timestamp}
+    response = call_api(headers, params, session, stream=True)
+    stream = HomeworkStream(response.iter_content(STREAM_CHUNK_SIZE))
+    latest = {}
+    for homework in stream:
+        saved = latest.get(homework['homework_name'])
+        if saved is None or ((homework.get('date_updated') or '')
+                             > (saved.get('date_updated') or '')):
+            latest[homework['homework_name']] = homework
+    homeworks = [homework for homework in latest.values()
+                 if keep is None or keep(homework)]
+    check_answer(stream.meta, headers, params)
+    if 'homeworks' in stream.meta:
+        raise TypeError(RESPONSE_TYPE_FAIL.format(
+            type(stream.meta['homeworks'])))
+    if not stream.has_homeworks:
+        raise KeyError(RESPONSE_KEY_FAIL)
+    return dict(stream.meta, homeworks=homeworks)
+
+
+def get_api_answer(current_timestamp):
+    """Запрос API Практикума."""
+    return request_api(HEADERS, current_timestamp)
+
+
 def check_response(response):
     """Проверка ответа."""
     try:
@@ -93,45 +238,534 @@ def check_response(response):
 
 def parse_status(homework):
     """Извлечение статуса."""
-    homework_name = homework['homework_name']
-    status = homework['status']
-    if status in VERDICTS:
-        return VERDICT.format(homework_name, VERDICTS[status])
-    raise ValueError(STATUS_FAIL.format(status))
+    record = as_record(homework)
+    return render_verdict(record.name, record.status, DEFAULT_LOCALE)
 
 
 def check_tokens():
     """Проверка доступности переменных окружения."""
-    lost_tokens = [token for token in TOKENS if globals()[token] is None]
+    tokens = {'TELEGRAM_TOKEN': TELEGRAM_TOKEN}
+    if not TENANTS_FILE:
+        tokens.update(
+            PRACTICUM_TOKEN=PRACTICUM_TOKEN,
+            TELEGRAM_CHAT_ID=TELEGRAM_CHAT_ID)
+    if WEBHOOK_PORT:
+        tokens.update(WEBHOOK_SECRET=WEBHOOK_SECRET)
+    lost_tokens = sorted(name for name, value in tokens.items()
+                         if value is None)
     if lost_tokens:
-        logger.error(MISSING_TOKEN.format(lost_tokens))
+        logger.error(Lazy(MISSING_TOKEN, lost_tokens))
         return False
     return True
 
 
-def main():
-    """Основная логика работы бота."""
+def get_tenants():
+    """Реестр подписчиков: из TENANTS_FILE или из переменных окружения."""
+    if TENANTS_FILE:
+        tenants = load_tenants(TENANTS_FILE)
+    else:
+        tenants = [Tenant(PRACTICUM_TOKEN, [Subscriber(TELEGRAM_CHAT_ID)])]
+    logger.info(Lazy(TENANTS_LOADED, len(tenants)))
+    return tenants
+
+
+def render_statuses(tenants, locale=DEFAULT_LOCALE):
+    """Ответ на /status по кэшу последних статусов, без запроса к API."""
+    lines = [
+        render('status_line', locale, name, verdict_text(status, locale))
+        for tenant in tenants
+        for name, status in tenant.statuses.items()
+    ]
+    return '\n'.join(lines) or render('status_unknown', locale)
+
+
+def render_partitions(tenants, locale=DEFAULT_LOCALE):
+    """Ответ на /status в режиме шардов: статусы из контрольной точки.
+
+    Статусы живут в процессах-шардах, поэтому супервизор читает их
+    из разделов CHECKPOINT_FILE; они отстают не больше чем
+    на CHECKPOINT_INTERVAL.
+    """
+    data = load_partitions(CHECKPOINT_FILE) if CHECKPOINT_FILE else {}
+    saved = []
+    for tenant in tenants:
+        copy = Tenant(tenant.practicum_token)
+        copy.statuses.update(data.get(copy.key, {}).get('statuses', {}))
+        saved.append(copy)
+    return render_statuses(saved, locale)
+
+
+def start_inbound(bot, tenants, render=render_statuses):
+    """Запуск вебхука для команд пользователей, если задан WEBHOOK_PORT.
+
+    Telegram присылает WEBHOOK_SECRET в заголовке каждого обновления;
+    запросы без него вебхук отклоняет.
+    """
+    if not WEBHOOK_PORT:
+        return
+    start_webhook(
+        int(WEBHOOK_PORT), WEBHOOK_PATH, tenants, render, WEBHOOK_SECRET)
+    if WEBHOOK_URL:
+        bot.set_webhook(
+            WEBHOOK_URL + WEBHOOK_PATH,
+            api_kwargs={'secret_token': WEBHOOK_SECRET})
+
+
+async def run_limited(semaphore, func, *args):
+    """Блокирующий вызов в пуле потоков под семафором."""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+
+async def call_with_breaker(breaker, func, *args):
+    """Вызов через автомат: его размыкают сбои соединения и ответы 5xx.
+
+    Ответы 4xx относятся к одному токену и общий автомат не трогают.
+    """
+    breaker.before_call()
+    try:
+        answer = await func(*args)
+    except BREAKER_FAILURES:
+        breaker.record_failure()
+        raise
+    except Exception:
+        breaker.record_success()
+        raise
+    breaker.record_success()
+    return answer
+
+
+async def async_request_api(semaphore, headers, current_timestamp,
+                            session=None, breaker=None, keep=None):
+    """Асинхронный запрос API Практикума.
+
+    При разомкнутом автомате breaker запрос не занимает поток
+    и сразу завершается ошибкой CircuitOpen. Если задан фильтр keep,
+    ответ разбирается потоково через stream_api.
+    """
+    request = request_api
+    if keep is not None:
+        request = functools.partial(stream_api, keep=keep)
+    args = (semaphore, request, headers, current_timestamp, session)
+    with timed(API_SECONDS):
+        if breaker is None:
+            return await run_limited(*args)
+        return await call_with_breaker(breaker, run_limited, *args)
+
+
+async def broadcast(sender, tenant, text):
+    """Рассылка всем подписчикам токена; text(locale) даёт текст.
+
+    Возвращает доставки, по одной на чат, с отдельным итогом у каждой.
+    """
+    return await asyncio.gather(*(
+        sender.send(subscriber.chat_id, text(subscriber.locale))
+        for subscriber in tenant.subscribers))
+
+
+def change_entries(tenant, changes):
+    """Уведомления (key, chat_id, text) о каждой смене статуса."""
+    return [
+        (delivery_key(tenant, subscriber.chat_id, record),
+         subscriber.chat_id,
+         render_verdict(record.name, record.status, subscriber.locale))
+        for record in reversed(changes)
+        for subscriber in tenant.subscribers
+    ]
+
+
+def digest_entries(tenant, changes):
+    """Одна сводка смен статусов на чат вместо сообщения на каждую."""
+    return [
+        (delivery_key(tenant, subscriber.chat_id, *part),
+         subscriber.chat_id, text)
+        for subscriber in tenant.subscribers
+        for part, text in render_digest(
+            changes, subscriber.locale, MESSAGE_LIMIT)
+    ]
+
+
+async def notify_changes(sender, tenant, homeworks, catch_up=False):
+    """Оповещение только о новых статусах работ из пачки.
+
+    В режиме догона catch_up статусы каждой работы сворачиваются
+    в последний, а о нескольких сменах приходит одна сводка.
+    """
+    with timed(PROCESS_SECONDS, stage='parse_status'):
+        records = [as_record(homework) for homework in homeworks]
+        if catch_up:
+            records = collapse(records)
+        changes = tenant.statuses.changes(records)
+    if catch_up and len(changes) > 1:
+        entries = digest_entries(tenant, changes)
+    else:
+        entries = change_entries(tenant, changes)
+    if entries:
+        await sender.send_all(tenant.key, entries)
+    for record in reversed(changes):
+        tenant.statuses.remember(record)
+    return len(changes)
+
+
+async def notify_incident(sender, tenant, notice):
+    """Оповещение о сбое или его окончании, если оно не подавлено.
+
+    Текст ошибки содержит заголовки запроса, а оповещение уходит
+    всем подписчикам токена, поэтому токены из него вырезаются.
+    """
+    if notice is not None:
+        redact = Redactor([tenant.practicum_token, TELEGRAM_TOKEN])
+        await broadcast(
+            sender, tenant, lambda locale: redact(notice.text(locale)))
+
+
+def backfill_filter(tenant):
+    """Фильтр потокового разбора для давно не опрошенного подписчика.
+
+    При широком окне from_date в ответе может быть вся история работ,
+    поэтому из неё сохраняются только изменившиеся статусы.
+    """
+    if time.time() - tenant.timestamp > STREAM_AFTER:
+        return lambda homework: tenant.statuses.changed(
+            Homework.from_dict(homework))
+    return None
+
+
+async def async_poll_tenant(semaphore, sender, tenant, session=None,
+                            breaker=None, quota=None):
+    """Один цикл опроса API для токена и рассылка подписчикам.
+
+    После простоя дольше CATCHUP_AFTER опрос идёт в режиме догона.
+    Ответы API и 429 учитываются в квотах quota. Ошибки QUIET_FAILURES
+    продолжают текущий сбой и оповещений не порождают.
+    """
+    try:
+        catch_up = time.time() - tenant.timestamp > CATCHUP_AFTER
+        response = await async_request_api(
+            semaphore, tenant.headers, tenant.timestamp, session, breaker,
+            backfill_filter(tenant))
+        if quota is not None:
+            quota.succeeded()
+        with timed(PROCESS_SECONDS, stage='check_response'):
+            homeworks = check_response(response)
+        changed = await notify_changes(sender, tenant, homeworks, catch_up)
+        tenant.timestamp = response.get('current_date', tenant.timestamp)
+        tenant.cadence.record_success(changed)
+        await notify_incident(sender, tenant, tenant.incident.recovery())
+    except Exception as error:
+        if quota is not None and isinstance(error, Throttled):
+            quota.throttled(tenant.key, error.retry_after)
+        tenant.cadence.record_failure()
+        logger.error(Lazy(PROGRAMM_ERROR, error))
+        if not isinstance(error, QUIET_FAILURES):
+            await notify_incident(
+                sender, tenant, tenant.incident.failure(error))
+
+
+class PollEngine:
+    """Опрос подписчиков по срокам из общей очереди."""
+
+    def __init__(self, sender, tenants, session=None, checkpoint=None,
+                 watcher=None):
+        """Движок с адаптивной политикой и общим бюджетом запросов."""
+        self.sender = sender
+        self.tenants = tenants
+        self.session = session
+        self.checkpoint = checkpoint
+        self.watcher = watcher
+        self.policy = AdaptivePolicy(
+            RETRY_TIME, REVIEWING_RETRY_TIME, MAX_RETRY_TIME, RETRY_JITTER)
+        self.quota = QuotaManager(
+            REQUESTS_PER_SECOND, TOKEN_REQUESTS_PER_MINUTE / 60, TOKEN_BURST)
+        self.breaker = CircuitBreaker(
+            BREAKER_FAILURE_RATE, BREAKER_WINDOW,
+            reset_timeout=BREAKER_RESET_TIMEOUT)
+        self.queue = DeadlineQueue()
+        self.tasks = set()
+        self.semaphore = None
+        self.wakeup = None
+
+    def reconfigure(self):
+        """Применение текущих настроек модуля к работающему движку.
+
+        Политика заменяется целиком, у квот и автомата меняются
+        только пределы. Новые интервалы действуют с ближайшего переноса.
+        """
+        self.policy = AdaptivePolicy(
+            RETRY_TIME, REVIEWING_RETRY_TIME, MAX_RETRY_TIME, RETRY_JITTER)
+        self.quota.configure(
+            REQUESTS_PER_SECOND, TOKEN_REQUESTS_PER_MINUTE / 60)
+        self.breaker.configure(
+            BREAKER_FAILURE_RATE, BREAKER_WINDOW, BREAKER_RESET_TIMEOUT)
+
+    def queue_depth(self):
+        """Число подписок в расписании."""
+        return len(self.queue)
+
+    def queue_lag(self):
+        """Отставание ближайшего опроса от срока, в секундах."""
+        return self.queue.lag(time.monotonic())
+
+    def reschedule(self, tenant):
+        """Новый срок опроса по итогам последнего опроса."""
+        delay = self.policy.delay(
+            tenant.cadence, tenant.statuses.has_status('reviewing'))
+        self.queue.schedule(tenant.key, tenant, time.monotonic() + delay)
+        self.wakeup.set()
+
+    def defer(self, tenant, delay):
+        """Перенос опроса токена, исчерпавшего свою квоту."""
+        self.queue.schedule(tenant.key, tenant, time.monotonic() + delay)
+        self.wakeup.set()
+
+    async def poll(self, tenant):
+        """Опрос подписчика в пределах квот и перенос его срока."""
+        wait, deferred = self.quota.reserve(tenant.key)
+        if deferred:
+            self.defer(tenant, wait)
+            return
+        try:
+            await asyncio.sleep(wait)
+            await async_poll_tenant(
+                self.semaphore, self.sender, tenant, self.session,
+                self.breaker, self.quota)
+        finally:
+            self.reschedule(tenant)
+
+    def start_polls(self):
+        """Запуск опросов, срок которых наступил."""
+        now = time.monotonic()
+        if self.queue.next_due() is not None:
+            LOOP_LAG_SECONDS.observe(self.queue.lag(now))
+        for tenant in self.queue.pop_due(now):
+            task = asyncio.ensure_future(self.poll(tenant))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def dispatch(self):
+        """Пробуждение только к ближайшему сроку или переносу срока."""
+        while True:
+            self.start_polls()
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(),
+                    self.queue.wait_time(time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def save_checkpoints(self):
+        """Периодическое сохранение контрольной точки."""
+        while True:
+            await asyncio.sleep(CHECKPOINT_INTERVAL)
+            self.checkpoint.save(self.tenants)
+
+    async def watch_config(self):
+        """Периодическая проверка файла настроек."""
+        while True:
+            await asyncio.sleep(CONFIG_POLL_INTERVAL)
+            self.watcher.check()
+
+    async def run(self):
+        """Запуск опроса всех подписчиков."""
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=POLL_CONCURRENCY))
+        self.semaphore = asyncio.Semaphore(POLL_CONCURRENCY)
+        self.wakeup = asyncio.Event()
+        now = time.monotonic()
+        for tenant in self.tenants:
+            self.queue.schedule(tenant.key, tenant, now)
+        loops = [self.dispatch()]
+        if self.checkpoint is not None:
+            loops.append(self.save_checkpoints())
+        if self.watcher is not None:
+            loops.append(self.watch_config())
+        await asyncio.gather(*loops)
+
+
+def register_gauges(engine, sender, session):
+    """Показатели очередей, кэша и автомата для /metrics."""
+    Gauge('homework_poll_queue_depth', 'Подписки в расписании.',
+          engine.queue_depth)
+    Gauge('homework_poll_queue_lag_seconds', 'Просрочка ближайшего опроса.',
+          engine.queue_lag)
+    Gauge('homework_send_queue_length', 'Сообщения в очереди отправки.',
+          sender.__len__)
+    Gauge('homework_response_cache_hit_ratio', 'Доля попаданий в кэш.',
+          session.hit_rate)
+    Gauge('homework_quota_utilization', 'Расход квоты запросов токена.',
+          engine.quota.utilization, labels=('token',))
+    Gauge('homework_quota_global_utilization', 'Расход общей квоты.',
+          engine.quota.global_utilization)
+    Gauge('homework_quota_rate_share', 'Общая скорость после 429.',
+          engine.quota.rate_share)
+    Gauge('homework_quota_deferred', 'Перенесённые опросы.',
+          lambda: sum(engine.quota.deferred.values()))
+    Gauge('homework_circuit_open', 'Автомат API разомкнут.',
+          lambda: int(engine.breaker.state != CLOSED))
+
+
+def apply_config(values):
+    """Замена настраиваемых констант модуля проверенными значениями."""
+    globals().update(values)
+
+
+def configure(engine, sender, session, values):
+    """Горячее применение настроек к движку, очереди и кэшу ответов."""
+    apply_config(values)
+    engine.reconfigure()
+    sender.set_rates(TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE)
+    session.ttl = RESPONSE_CACHE_TTL
+
+
+def open_checkpoint(tenants, timestamp, shard=None):
+    """Контрольная точка (раздел шарда) с восстановленным состоянием."""
+    if not CHECKPOINT_FILE:
+        return None
+    if shard is not None:
+        checkpoint = PartitionCheckpoint(CHECKPOINT_FILE, shard)
+    else:
+        checkpoint = Checkpoint(CHECKPOINT_FILE)
+    checkpoint.restore(tenants, timestamp)
+    return checkpoint
+
+
+def start_sender(bot, tenants):
+    """Поток отправки; неотправленное из OUTBOX_FILE ставится первым."""
+    outbox = Outbox(OUTBOX_FILE) if OUTBOX_FILE else None
+    sender = SendQueue(
+        bot, TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE, outbox=outbox)
+    if outbox is not None:
+        outbox.purge()
+        sender.replay({tenant.key for tenant in tenants})
+    sender.start()
+    return sender
+
+
+def env_settings():
+    """Настраиваемые на ходу значения из окружения, уже проверенные.
+
+    Без CATCHUP_AFTER в окружении он равен двум MAX_RETRY_TIME.
+    """
+    values = {name: globals()[name] for name in SETTINGS}
+    if os.getenv('CATCHUP_AFTER') is None:
+        intervals = validate({}, {
+            name: values[name] for name in (
+                'RETRY_TIME', 'REVIEWING_RETRY_TIME', 'MAX_RETRY_TIME')})
+        values['CATCHUP_AFTER'] = 2 * intervals['MAX_RETRY_TIME']
+    return validate({}, values)
+
+
+def load_settings():
+    """Приведение и проверка настроек окружения и CONFIG_FILE.
+
+    Вызывается до настройки журнала в каждом процессе: недопустимое
+    значение останавливает запуск с ConfigError.
+    """
+    global CONFIG_DEFAULTS
+    apply_config(validate_startup(
+        {name: globals()[name] for name in STARTUP_SETTINGS}))
+    CONFIG_DEFAULTS = env_settings()
+    if CONFIG_FILE:
+        apply_config(load_config(CONFIG_FILE, CONFIG_DEFAULTS))
+    else:
+        apply_config(CONFIG_DEFAULTS)
+
+
+def serve(shard=0, shards=1, supervised=False):
+    """Опрос подписчиков шарда shard из shards в текущем процессе.
+
+    Под супервизором supervised процесс пишет свой раздел контрольной
+    точки, а вебхук остаётся супервизору, даже если шард один.
+    """
     if not check_tokens():
         raise RuntimeError(CHECK_TOKENS_ERROR)
+    import telegram
+
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
+    tenants = get_tenants()
+    if supervised:
+        tenants = select_shard(tenants, shard, shards)
     current_timestamp = int(time.time())
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            homeworks = check_response(response)
-            if homeworks:
-                send_message(bot, parse_status(homeworks[0]))
-            current_timestamp = response.get(
-                'current_date', current_timestamp)
-        except Exception as error:
-            logger.error(PROGRAMM_ERROR.format(error))
-            send_message(bot, PROGRAMM_ERROR.format(error))
-        time.sleep(RETRY_TIME)
+    for tenant in tenants:
+        tenant.timestamp = current_timestamp
+    checkpoint = open_checkpoint(
+        tenants, current_timestamp, shard if supervised else None)
+    if not supervised:
+        start_inbound(bot, tenants)
+    session = CachingSession(make_session(
+        HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_BACKOFF, headers=HEADERS),
+        RESPONSE_CACHE_TTL)
+    sender = start_sender(bot, tenants)
+    engine = PollEngine(sender, tenants, session, checkpoint)
+    if CONFIG_FILE:
+        engine.watcher = ConfigWatcher(
+            CONFIG_FILE, CONFIG_DEFAULTS,
+            functools.partial(configure, engine, sender, session))
+    if METRICS_PORT:
+        register_gauges(engine, sender, session)
+        start_metrics_server(int(METRICS_PORT) + shard)
+    try:
+        asyncio.run(engine.run())
+    finally:
+        if checkpoint is not None:
+            checkpoint.save(tenants)
+        sender.stop(SENDER_STOP_TIMEOUT)
+
+
+def stop_shard(signum, frame):
+    """SIGTERM процесса опроса: выход с сохранением контрольной точки.
+
+    Точка сохраняется до отправки остатка очереди, а сама отправка
+    ограничена SENDER_STOP_TIMEOUT: процесс успевает выйти раньше,
+    чем его добьёт SIGKILL супервизора или платформы.
+    """
+    raise SystemExit(0)
+
+
+def run_shard(shard, shards):
+    """Точка входа процесса-шарда."""
+    signal.signal(signal.SIGTERM, stop_shard)
+    load_settings()
+    listener = setup_logging(
+        f'{LOG_FILE}.{shard}', max_bytes=LOG_MAX_BYTES,
+        backup_count=LOG_BACKUP_COUNT,
+        secrets=[*TOKENS.values(), WEBHOOK_SECRET],
+        sampled=[EMPTY_LIST], sample_interval=LOG_SAMPLE_INTERVAL)
+    try:
+        serve(shard, shards, supervised=True)
+    finally:
+        listener.stop()
+
+
+def supervise():
+    """Супервизор SHARDS процессов; команды принимает он сам."""
+    if not check_tokens():
+        raise RuntimeError(CHECK_TOKENS_ERROR)
+    import telegram
+
+    start_inbound(
+        telegram.Bot(token=TELEGRAM_TOKEN), get_tenants(), render_partitions)
+    Supervisor(run_shard, SHARDS).run()
+
+
+def main():
+    """Основная логика работы бота."""
+    if SHARDS > 1:
+        supervise()
+    else:
+        signal.signal(signal.SIGTERM, stop_shard)
+        serve()
 
 
 if __name__ == '__main__':
-    logging.basicConfig(
-        filename=__file__ + '.log',
-        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-        level=logging.INFO)
-    main()
+    load_settings()
+    listener = setup_logging(
+        LOG_FILE, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+        secrets=[*TOKENS.values(), WEBHOOK_SECRET], sampled=[EMPTY_LIST],
+        sample_interval=LOG_SAMPLE_INTERVAL)
+    try:
+        main()
+    finally:
+        listener.stop()
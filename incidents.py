@@ -0,0 +1,82 @@
+import re
+import time
+
+from messages import render
+
+ERROR_WINDOW = 3600
+VOLATILE = re.compile(
+    r'<[^<>]* object at 0x[0-9a-fA-F]+>|0x[0-9a-fA-F]+|\{[^{}]*\}|\d+')
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип и текст без чисел и словарей.
+
+    В SERVER_ERROR и JSON_ERROR меняются from_date и заголовки, а в
+    ошибках соединения urllib3 - адрес объекта соединения, поэтому
+    без нормализации каждый цикл давал бы новый отпечаток.
+    """
+    return type(error).__name__, VOLATILE.sub('#', str(error))
+
+
+class Notice:
+    """Оповещение о сбое, которое выводится на языке подписчика."""
+
+    __slots__ = ('key', 'count', 'error')
+
+    def __init__(self, key, count, error=None):
+        """Вид оповещения key: program_error, still_failing, recovered."""
+        self.key = key
+        self.count = count
+        self.error = error
+
+    def text(self, locale):
+        """Текст оповещения в локали locale."""
+        if self.key == 'recovered':
+            return render('recovered', locale, self.count)
+        message = render('program_error', locale, self.error)
+        if self.key == 'still_failing':
+            return render('still_failing', locale, self.count, message)
+        return message
+
+
+class Incident:
+    """Текущий сбой токена и подавление повторных оповещений."""
+
+    __slots__ = ('window', 'clock', 'fingerprint', 'count', 'notified_at')
+
+    def __init__(self, window=ERROR_WINDOW, clock=time.monotonic):
+        """Без сбоя; window - пауза между напоминаниями, в секундах."""
+        self.window = window
+        self.clock = clock
+        self.fingerprint = None
+        self.count = 0
+        self.notified_at = None
+
+    def failure(self, error):
+        """Учёт ошибки; возвращает Notice или None.
+
+        О новом сбое сообщается сразу, повторы в пределах window
+        подавляются, затем приходит одна сводка с их числом.
+        """
+        now = self.clock()
+        current = fingerprint(error)
+        if current != self.fingerprint:
+            self.fingerprint = current
+            self.count = 1
+            self.notified_at = now
+            return Notice('program_error', 1, error)
+        self.count += 1
+        if now - self.notified_at < self.window:
+            return None
+        self.notified_at = now
+        return Notice('still_failing', self.count, error)
+
+    def recovery(self):
+        """Закрытие сбоя после удачного опроса; Notice или None."""
+        if self.fingerprint is None:
+            return None
+        notice = Notice('recovered', self.count)
+        self.fingerprint = None
+        self.count = 0
+        self.notified_at = None
+        return notice
@@ -0,0 +1,170 @@
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_QUEUE_SIZE = 10000
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+SAMPLE_INTERVAL = 600
+MASK = '***'
+SECRET_PATTERNS = (
+    re.compile(r'(OAuth\s+)[\w.-]+'),
+    re.compile(r'()\b\d{5,}:[\w-]{30,}'),
+)
+
+
+class Lazy:
+    """Сообщение журнала, которое собирается str.format при выводе.
+
+    Шаблоны бота записаны в стиле {0}, а logging умеет откладывать
+    только %-форматирование, поэтому шаблон и аргументы хранятся
+    до обработки записи в потоке журнала.
+    """
+
+    __slots__ = ('template', 'args')
+
+    def __init__(self, template, *args):
+        """Шаблон template с аргументами args."""
+        self.template = template
+        self.args = args
+
+    def __str__(self):
+        """Текст сообщения."""
+        return self.template.format(*self.args)
+
+
+def template_of(record):
+    """Шаблон сообщения записи без подстановки аргументов."""
+    return getattr(record.msg, 'template', record.msg)
+
+
+class Redactor:
+    """Замена токенов в тексте на MASK."""
+
+    def __init__(self, secrets=()):
+        """Кроме шаблонов SECRET_PATTERNS скрываются строки secrets."""
+        self.secrets = [secret for secret in secrets if secret]
+
+    def __call__(self, text):
+        """Текст без токенов."""
+        for pattern in SECRET_PATTERNS:
+            text = pattern.sub(r'\1' + MASK, text)
+        for secret in self.secrets:
+            text = text.replace(secret, MASK)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись журнала одной строкой JSON без токенов."""
+
+    def __init__(self, secrets=()):
+        """Форматтер, скрывающий secrets и токены по шаблонам."""
+        super().__init__()
+        self.redact = Redactor(secrets)
+
+    def format(self, record):
+        """Строка JSON с временем, уровнем, источником и текстом."""
+        data = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'suppressed', 0):
+            data['suppressed'] = record.suppressed
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return self.redact(json.dumps(data, ensure_ascii=False))
+
+
+class SampleFilter(logging.Filter):
+    """Прореживание повторяющихся сообщений.
+
+    Из записей с шаблоном из templates пропускается первая, остальные
+    в течение interval секунд отбрасываются. Следующая пропущенная
+    запись получает поле suppressed с числом отброшенных.
+    """
+
+    def __init__(self, templates, interval=SAMPLE_INTERVAL,
+                 clock=time.monotonic):
+        """Фильтр шаблонов templates с окном interval."""
+        super().__init__()
+        self.templates = frozenset(templates)
+        self.interval = interval
+        self.clock = clock
+        self.seen = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        """False для отбрасываемой записи."""
+        template = template_of(record)
+        if template not in self.templates:
+            return True
+        now = self.clock()
+        key = (record.name, template)
+        with self.lock:
+            passed_at, suppressed = self.seen.get(key, (None, 0))
+            if passed_at is not None and now - passed_at < self.interval:
+                self.seen[key] = (passed_at, suppressed + 1)
+                return False
+            self.seen[key] = (now, 0)
+        record.suppressed = suppressed
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler, не форматирующий запись в вызывающем потоке.
+
+    Очередь живёт в том же процессе, поэтому запись передаётся как
+    есть; при переполнении очереди запись отбрасывается и учитывается
+    в dropped, а не блокирует опрос.
+    """
+
+    def __init__(self, log_queue):
+        """Обработчик, кладущий записи в log_queue."""
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        """Запись без предварительного форматирования."""
+        return record
+
+    def enqueue(self, record):
+        """Постановка записи в очередь без ожидания."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(filename, level=logging.INFO, max_bytes=MAX_BYTES,
+                  backup_count=BACKUP_COUNT, secrets=(), sampled=(),
+                  sample_interval=SAMPLE_INTERVAL):
+    """Асинхронный журнал: JSON в файл с ротацией и в stderr.
+
+    Корневой логгер только кладёт записи в очередь, форматирует
+    и пишет их поток QueueListener. Возвращает запущенный listener,
+    его нужно остановить перед выходом, чтобы дописать очередь.
+    """
+    formatter = JsonFormatter(secrets)
+    handlers = [
+        RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8'),
+        logging.StreamHandler(sys.stderr),
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    handler = LazyQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(SampleFilter(sampled, sample_interval))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    listener = QueueListener(handler.queue, *handlers)
+    listener.start()
+    return listener
@@ -0,0 +1,89 @@
+import functools
+
+from records import Status
+
+DEFAULT_LOCALE = 'ru'
+RENDER_CACHE_SIZE = 4096
+
+CATALOG = {
+    'ru': {
+        'verdict': 'Изменился статус проверки работы "{0}"-{1}',
+        'program_error': 'Сбой в работе программы: {0}',
+        'status_line': 'Работа "{0}": {1}',
+        'status_unknown': 'Статусы работ пока неизвестны.',
+        'still_failing': 'Сбой продолжается (повторов: {0}): {1}',
+        'recovered': 'Работа программы восстановлена. Сбоев подряд: {0}.',
+        'digest': 'Изменения статусов за время простоя ({0}):',
+        'verdicts': {
+            Status.APPROVED:
+                'Работа проверена: ревьюеру всё понравилось. Ура!',
+            Status.REVIEWING: 'Работа взята на проверку ревьюером.',
+            Status.REJECTED: 'Работа проверена: у ревьюера есть замечания.',
+        },
+    },
+    'en': {
+        'verdict': 'Review status of "{0}" changed - {1}',
+        'program_error': 'Bot failure: {0}',
+        'status_line': 'Homework "{0}": {1}',
+        'status_unknown': 'Homework statuses are not known yet.',
+        'still_failing': 'Still failing ({0} repeats): {1}',
+        'recovered': 'The bot has recovered after {0} failures in a row.',
+        'digest': 'Status changes while the bot was offline ({0}):',
+        'verdicts': {
+            Status.APPROVED:
+                'Reviewed: the reviewer liked everything. Hooray!',
+            Status.REVIEWING: 'The reviewer has started the review.',
+            Status.REJECTED: 'Reviewed: the reviewer left comments.',
+        },
+    },
+}
+
+FORMATTERS = {
+    locale: {
+        key: template.format
+        for key, template in table.items() if isinstance(template, str)
+    }
+    for locale, table in CATALOG.items()
+}
+
+
+def table(locale):
+    """Таблица сообщений локали; неизвестная локаль - DEFAULT_LOCALE."""
+    return CATALOG.get(locale, CATALOG[DEFAULT_LOCALE])
+
+
+def render(key, locale, *args):
+    """Сообщение key локали locale по заранее связанному шаблону."""
+    formatters = FORMATTERS.get(locale, FORMATTERS[DEFAULT_LOCALE])
+    return formatters[key](*args)
+
+
+def verdict_text(status, locale):
+    """Текст вердикта ревьюера для статуса."""
+    return table(locale)['verdicts'][status]
+
+
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_verdict(name, status, locale):
+    """Сообщение о смене статуса; одинаковые сообщения собираются один раз."""
+    return render('verdict', locale, name, verdict_text(status, locale))
+
+
+def render_digest(records, locale, limit):
+    """Сводка смен статусов одним сообщением или несколькими до limit.
+
+    Возвращает пары (записи части, текст части).
+    """
+    header = render('digest', locale, len(records))
+    parts = []
+    part, text = [], header
+    for record in records:
+        line = render('status_line', locale, record.name,
+                      verdict_text(record.status, locale))
+        if part and len(text) + 1 + len(line) > limit:
+            parts.append((part, text))
+            part, text = [], header
+        part.append(record)
+        text += '\n' + line
+    parts.append((part, text))
+    return parts
@@ -0,0 +1,227 @@
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from logs import Lazy
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+METRICS_STARTED = 'Метрики доступны на порту {0}.'
+OK = 'ok'
+
+logger = logging.getLogger(__name__)
+
+
+def format_labels(names, values, extra=()):
+    """Метки в формате Prometheus: {a="1",b="2"}."""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{0}="{1}"'.format(name, str(value).replace('"', '\\"'))
+        for name, value in pairs)
+    return '{' + body + '}'
+
+
+class Metric:
+    """Общая часть метрик: имя, описание, метки и блокировка."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), registry=None):
+        """Метрика регистрируется в registry, по умолчанию в REGISTRY."""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def key(self, labels):
+        """Значения меток в порядке объявления."""
+        return tuple(labels.get(name, '') for name in self.labels)
+
+    def header(self):
+        """Строки HELP и TYPE."""
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+
+
+class Counter(Metric):
+    """Монотонный счётчик."""
+
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        """Счётчик без значений."""
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        """Увеличение счётчика."""
+        key = self.key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        """Текущее значение счётчика."""
+        return self.values.get(self.key(labels), 0)
+
+    def samples(self):
+        """Строки значений."""
+        with self._lock:
+            items = list(self.values.items())
+        return [
+            f'{self.name}{format_labels(self.labels, key)} {value}'
+            for key, value in items
+        ]
+
+
+class Gauge(Metric):
+    """Значение, вычисляемое функцией в момент сбора метрик."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, function, labels=(),
+                 registry=None):
+        """function() возвращает текущее значение.
+
+        С метками labels function() возвращает словарь
+        {значение метки или кортеж значений: значение}.
+        """
+        super().__init__(name, documentation, labels, registry)
+        self.function = function
+
+    def samples(self):
+        """Строки значений."""
+        if not self.labels:
+            return [f'{self.name} {self.function()}']
+        lines = []
+        for key, value in self.function().items():
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(
+                f'{self.name}{format_labels(self.labels, key)} {value}')
+        return lines
+
+
+class Histogram(Metric):
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        """Гистограмма с корзинами buckets, в секундах."""
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        """Учёт одного наблюдения."""
+        key = self.key(labels)
+        with self._lock:
+            counts, total = self.values.get(
+                key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        """Число наблюдений с данными метками."""
+        counts, _ = self.values.get(self.key(labels), ((), 0))
+        return sum(counts)
+
+    def samples(self):
+        """Строки корзин, суммы и количества."""
+        with self._lock:
+            items = [(key, list(counts), total)
+                     for key, (counts, total) in self.values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = format_labels(self.labels, key, [('le', bound)])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self):
+        """Пустой набор."""
+        self.metrics = {}
+
+    def register(self, metric):
+        """Добавление метрики; имя заменяет прежнюю с тем же именем."""
+        self.metrics[metric.name] = metric
+
+    def unregister(self, name):
+        """Удаление метрики."""
+        self.metrics.pop(name, None)
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+@contextlib.contextmanager
+def timed(histogram, **labels):
+    """Замер длительности блока; outcome - ok или имя класса ошибки."""
+    started = time.perf_counter()
+    outcome = OK
+    try:
+        yield
+    except Exception as error:
+        outcome = type(error).__name__
+        raise
+    finally:
+        if 'outcome' in histogram.labels:
+            labels['outcome'] = outcome
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдача метрик по GET /metrics."""
+
+    def do_GET(self):
+        """Текстовый формат Prometheus."""
+        if self.path != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Журнал запросов через logging вместо stderr."""
+        logger.debug(format, *args)
+
+
+def start_metrics_server(port, registry=REGISTRY, host=''):
+    """Запуск HTTP-сервера /metrics в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(
+        target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(Lazy(METRICS_STARTED, server.server_address[1]))
+    return server
@@ -0,0 +1,127 @@
+import contextlib
+import hashlib
+import sqlite3
+import threading
+import time
+
+RETENTION = 7 * 86400
+BUSY_TIMEOUT = 30
+SCHEMA = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=FULL',
+    'CREATE TABLE IF NOT EXISTS outbox ('
+    ' key TEXT PRIMARY KEY,'
+    ' tenant TEXT NOT NULL,'
+    ' chat_id NOT NULL,'
+    ' text TEXT NOT NULL,'
+    ' created REAL NOT NULL,'
+    " status TEXT NOT NULL DEFAULT 'queued',"
+    ' finished REAL)',
+    'CREATE INDEX IF NOT EXISTS outbox_status ON outbox (status)',
+)
+INSERT = (
+    'INSERT OR IGNORE INTO outbox (key, tenant, chat_id, text, created) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
+FINISH = 'UPDATE outbox SET status = ?, finished = ? WHERE key = ?'
+PENDING = (
+    "SELECT key, tenant, chat_id, text FROM outbox WHERE status = 'queued' "
+    'ORDER BY rowid'
+)
+PURGE = "DELETE FROM outbox WHERE status != 'queued' AND finished < ?"
+
+
+def delivery_key(tenant, chat_id, *records):
+    """Ключ идемпотентности уведомления о смене статусов records.
+
+    Повторно обнаруженная смена (например, после перезапуска
+    со старой контрольной точки) даёт тот же ключ и не отправляется
+    второй раз.
+    """
+    value = '\0'.join(map(str, (tenant.key, chat_id) + tuple(
+        field for record in records
+        for field in (record.name, record.status.value, record.date_updated)
+    )))
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class Outbox:
+    """Журнал исходящих уведомлений в SQLite.
+
+    Уведомления записываются до того, как опрос сдвинет current_date,
+    и помечаются после ответа Telegram. После перезапуска
+    неотправленные записи отправляются заново одним проходом. Файл
+    может быть общим для процессов-шардов.
+    """
+
+    def __init__(self, path, clock=time.time):
+        """Открытие или создание журнала path."""
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None,
+            check_same_thread=False)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Транзакция под блокировкой; при любой ошибке - ROLLBACK.
+
+        Без отката соединение осталось бы внутри транзакции, и каждый
+        следующий BEGIN падал бы с ошибкой.
+        """
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+                self.connection.execute('COMMIT')
+            except BaseException:
+                if self.connection.in_transaction:
+                    self.connection.execute('ROLLBACK')
+                raise
+
+    def add(self, tenant_key, entries):
+        """Запись уведомлений (key, chat_id, text) одной транзакцией.
+
+        Возвращает ключи, которых в журнале ещё не было: только их
+        нужно ставить в очередь отправки.
+        """
+        now = self.clock()
+        added = set()
+        with self.transaction():
+            for key, chat_id, text in entries:
+                cursor = self.connection.execute(
+                    INSERT, (key, tenant_key, chat_id, text, now))
+                if cursor.rowcount:
+                    added.add(key)
+        return added
+
+    def finish(self, keys, status):
+        """Итог доставки для ключей keys."""
+        now = self.clock()
+        with self.transaction():
+            self.connection.executemany(
+                FINISH, [(status, now, key) for key in keys])
+
+    def pending(self, tenant_keys=None):
+        """Неотправленные (key, chat_id, text) в порядке записи.
+
+        tenant_keys ограничивает выборку токенами текущего шарда.
+        """
+        with self.lock:
+            rows = self.connection.execute(PENDING).fetchall()
+        return [
+            (key, chat_id, text) for key, tenant, chat_id, text in rows
+            if tenant_keys is None or tenant in tenant_keys
+        ]
+
+    def purge(self, retention=RETENTION):
+        """Удаление завершённых записей старше retention секунд."""
+        with self.lock:
+            self.connection.execute(PURGE, (self.clock() - retention,))
+
+    def close(self):
+        """Закрытие соединения."""
+        with self.lock:
+            self.connection.close()
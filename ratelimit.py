@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import Counter
+
+THROTTLE_FACTOR = 0.5
+RECOVERY_STEP = 0.1
+MIN_RATE_SHARE = 0.1
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не больше capacity."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        """Корзина создаётся полной."""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        """Резерв токенов; возвращает, сколько секунд ждать до их выдачи."""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def wait_time(self, amount=1):
+        """Сколько секунд ждать amount токенов, ничего не резервируя."""
+        with self._lock:
+            self._refill()
+            return max(amount - self.tokens, 0) / self.rate
+
+    def set_rate(self, rate, capacity=None):
+        """Новая скорость; накопленное до этого считается по старой."""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else max(rate, 1)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def try_acquire(self, amount=1):
+        """Взять токены, только если они есть прямо сейчас."""
+        with self._lock:
+            self._refill()
+            if self.tokens < amount:
+                return False
+            self.tokens -= amount
+            return True
+
+    def available(self):
+        """Сколько токенов доступно сейчас."""
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+
+class QuotaManager:
+    """Бюджеты запросов к API: общий и отдельный на каждый токен.
+
+    Опрос токена, исчерпавшего свой бюджет, не ждёт в очереди,
+    а переносится. Общая скорость снижается вдвое после ответа 429
+    и плавно, шагами RECOVERY_STEP, возвращается к ceiling после
+    удачных запросов: бот держится у наибольшей безопасной частоты.
+    """
+
+    def __init__(self, rate, token_rate, token_burst=1,
+                 clock=time.monotonic):
+        """Общий бюджет rate и token_rate запросов в секунду на токен."""
+        self.ceiling = rate
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.clock = clock
+        self.bucket = TokenBucket(rate, clock=clock)
+        self.buckets = {}
+        self.deferred = Counter()
+        self.throttled_total = 0
+        self._lock = threading.Lock()
+
+    def token_bucket(self, key):
+        """Корзина токена key."""
+        with self._lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(
+                    self.token_rate, self.token_burst, self.clock)
+            return self.buckets[key]
+
+    def reserve(self, key):
+        """Резерв запроса токена key: (ожидание в секундах, перенос).
+
+        Если бюджет токена исчерпан, ничего не резервируется: второй
+        элемент True, а первый - через сколько опрос можно повторить.
+        Иначе первый элемент - ожидание общего бюджета.
+        """
+        bucket = self.token_bucket(key)
+        wait = bucket.wait_time()
+        if wait > 0:
+            self.deferred[key] += 1
+            return wait, True
+        bucket.reserve()
+        return self.bucket.reserve(), False
+
+    def throttled(self, key, retry_after=None):
+        """Ответ 429: снижение общей скорости и пауза токена."""
+        self.throttled_total += 1
+        self.bucket.set_rate(max(
+            self.bucket.rate * THROTTLE_FACTOR,
+            self.ceiling * MIN_RATE_SHARE))
+        if retry_after:
+            bucket = self.token_bucket(key)
+            bucket.reserve(retry_after * bucket.rate)
+
+    def succeeded(self):
+        """Удачный запрос: шаг возврата общей скорости к ceiling."""
+        if self.bucket.rate < self.ceiling:
+            self.bucket.set_rate(min(
+                self.bucket.rate + self.ceiling * RECOVERY_STEP,
+                self.ceiling))
+
+    def configure(self, rate, token_rate):
+        """Новые пределы без сброса накопленного состояния.
+
+        Корзины сохраняют свои токены, в том числе долг после
+        Retry-After, а общая скорость - долю от ceiling после 429:
+        перезагрузка настроек не снимает торможения.
+        """
+        share = self.bucket.rate / self.ceiling
+        self.ceiling = rate
+        self.bucket.set_rate(rate * share)
+        with self._lock:
+            self.token_rate = token_rate
+            buckets = list(self.buckets.values())
+        for bucket in buckets:
+            bucket.set_rate(token_rate, self.token_burst)
+
+    def utilization(self):
+        """Доля израсходованного бюджета каждого токена, от 0 до 1."""
+        with self._lock:
+            buckets = list(self.buckets.items())
+        return {
+            key: round(1 - max(bucket.available(), 0) / bucket.capacity, 3)
+            for key, bucket in buckets
+        }
+
+    def global_utilization(self):
+        """Доля израсходованного общего бюджета."""
+        return round(
+            1 - max(self.bucket.available(), 0) / self.bucket.capacity, 3)
+
+    def rate_share(self):
+        """Текущая общая скорость как доля от ceiling."""
+        return round(self.bucket.rate / self.ceiling, 3)
@@ -0,0 +1,87 @@
+import enum
+import sys
+
+STATUS_FAIL = 'Статус {0} не найден.'
+
+
+class Status(str, enum.Enum):
+    """Статус проверки работы; совпадает с ключами VERDICTS."""
+
+    APPROVED = 'approved'
+    REVIEWING = 'reviewing'
+    REJECTED = 'rejected'
+
+
+def to_status(value):
+    """Статус из строки API; ValueError для недокументированного."""
+    try:
+        return Status(value)
+    except ValueError:
+        raise ValueError(STATUS_FAIL.format(value))
+
+
+class Homework:
+    """Компактная запись о работе вместо словаря из ответа API.
+
+    Хранит только поля, нужные боту; имя интернируется, статус - один
+    из членов Status, поэтому запись в разы меньше исходного словаря.
+    """
+
+    __slots__ = ('name', 'status', 'id', 'date_updated')
+
+    def __init__(self, name, status, id=None, date_updated=None):
+        """Запись из уже проверенных значений."""
+        self.name = name
+        self.status = status
+        self.id = id
+        self.date_updated = date_updated
+
+    @classmethod
+    def from_dict(cls, homework):
+        """Проверка и упаковка работы из ответа API.
+
+        Как и раньше, нет ключа - KeyError, неизвестный статус -
+        ValueError.
+        """
+        name = sys.intern(homework['homework_name'])
+        return cls(
+            name,
+            to_status(homework['status']),
+            homework.get('id'),
+            homework.get('date_updated'),
+        )
+
+    def __eq__(self, other):
+        """Записи равны, если совпадают все поля."""
+        if not isinstance(other, Homework):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot)
+            for slot in self.__slots__)
+
+    def __repr__(self):
+        """Представление для журнала и отладки."""
+        return f'Homework({self.name!r}, {self.status.value!r})'
+
+
+def as_record(homework):
+    """Запись о работе из словаря API или уже готовой записи."""
+    if isinstance(homework, Homework):
+        return homework
+    return Homework.from_dict(homework)
+
+
+def collapse(records):
+    """Последняя запись каждой работы по date_updated, по возрастанию даты.
+
+    При догоне за длинный период промежуточные статусы работы
+    сворачиваются в итоговый.
+    """
+    latest = {}
+    for record in records:
+        saved = latest.get(record.name)
+        if saved is None or (
+                (record.date_updated or '') >= (saved.date_updated or '')):
+            latest[record.name] = record
+    return sorted(
+        latest.values(), key=lambda record: record.date_updated or '')
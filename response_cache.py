@@ -0,0 +1,142 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+NOT_MODIFIED = 304
+CACHE_TTL = 30
+CACHE_SIZE = 10000
+
+
+class CachedResponse:
+    """Ответ API с однократным разбором JSON."""
+
+    __slots__ = ('status_code', 'headers', 'digest', '_response', '_answer')
+
+    def __init__(self, response, digest):
+        """Обёртка над ответом requests; JSON разбирается при обращении."""
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.digest = digest
+        self._response = response
+        self._answer = None
+
+    def json(self):
+        """Разобранный ответ; повторные вызовы не разбирают JSON снова."""
+        response = self._response
+        if response is not None:
+            self._answer = response.json()
+            self._response = None
+        return self._answer
+
+
+class CachingSession:
+    """Кэширующая обёртка сессии для запросов к API Практикума.
+
+    Одинаковый запрос (адрес, Authorization, параметры) в пределах ttl
+    секунд обслуживается из кэша без обращения к сети. Иначе запрос
+    уходит с If-None-Match/If-Modified-Since; ответ 304 или тело
+    с тем же хешем возвращают уже разобранный ответ.
+
+    Ответы хранятся retention секунд, по умолчанию ttl: движок сдвигает
+    from_date после каждого опроса, и старые ответы ему уже не нужны.
+    Условный запрос возможен, только если retention больше ttl.
+    """
+
+    def __init__(self, session, ttl=CACHE_TTL, maxsize=CACHE_SIZE,
+                 clock=time.monotonic, retention=None):
+        """Кэш поверх session не больше maxsize ответов."""
+        self.session = session
+        self.ttl = ttl
+        self.retention = retention
+        self.maxsize = maxsize
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def hit_rate(self):
+        """Доля запросов, обслуженных без разбора нового ответа."""
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
+
+    def expire(self, now):
+        """Удаление ответов старше retention; вызывается под блокировкой.
+
+        Записи упорядочены по времени сохранения, поэтому устаревшие
+        лежат в начале.
+        """
+        retention = self.ttl if self.retention is None else self.retention
+        while self.entries:
+            stored_at, _ = next(iter(self.entries.values()))
+            if now - stored_at < retention:
+                return
+            self.entries.popitem(last=False)
+
+    def lookup(self, key):
+        """Сохранённый ответ и время его сохранения."""
+        with self._lock:
+            self.expire(self.clock())
+            return self.entries.get(key, (None, None))
+
+    def store(self, key, cached):
+        """Сохранение ответа с вытеснением устаревших и самых старых."""
+        with self._lock:
+            now = self.clock()
+            self.expire(now)
+            self.entries[key] = (now, cached)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def hit(self, key, cached):
+        """Учёт попадания и продление срока ответа."""
+        with self._lock:
+            self.hits += 1
+        self.store(key, cached)
+        return cached
+
+    def miss(self):
+        """Учёт промаха."""
+        with self._lock:
+            self.misses += 1
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        """GET с кэшем; ошибочные и потоковые ответы не кэшируются."""
+        if kwargs.get('stream'):
+            return self.session.get(
+                url, headers=headers, params=params, **kwargs)
+        headers = dict(headers or {})
+        key = (url, headers.get('Authorization'),
+               tuple(sorted((params or {}).items())))
+        stored_at, cached = self.lookup(key)
+        if cached is not None and self.clock() - stored_at < self.ttl:
+            return self.hit(key, cached)
+        if cached is not None:
+            headers.update(validators(cached))
+        response = self.session.get(
+            url, headers=headers, params=params, **kwargs)
+        if cached is not None and response.status_code == NOT_MODIFIED:
+            return self.hit(key, cached)
+        if response.status_code != 200:
+            self.miss()
+            return response
+        digest = hashlib.sha1(response.content).digest()
+        if cached is not None and cached.digest == digest:
+            return self.hit(key, cached)
+        self.miss()
+        cached = CachedResponse(response, digest)
+        self.store(key, cached)
+        return cached
+
+
+def validators(cached):
+    """Заголовки условного запроса по сохранённому ответу."""
+    headers = {}
+    if 'ETag' in cached.headers:
+        headers['If-None-Match'] = cached.headers['ETag']
+    if 'Last-Modified' in cached.headers:
+        headers['If-Modified-Since'] = cached.headers['Last-Modified']
+    return headers
@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import random
+
+MAX_EXPONENT = 16
+
+
+class Cadence:
+    """История опросов подписчика для расчёта следующей задержки."""
+
+    __slots__ = ('failures', 'idle_polls')
+
+    def __init__(self):
+        """Новый подписчик опрашивается с базовой частотой."""
+        self.failures = 0
+        self.idle_polls = 0
+
+    def record_success(self, changed):
+        """Учёт удачного опроса: были ли новые статусы."""
+        self.failures = 0
+        self.idle_polls = 0 if changed else self.idle_polls + 1
+
+    def record_failure(self):
+        """Учёт ошибки опроса."""
+        self.failures += 1
+
+
+class AdaptivePolicy:
+    """Задержка до следующего опроса вместо постоянного RETRY_TIME.
+
+    Пока работа на ревью, опрос идёт каждые fast секунд. После ошибок
+    и опросов без изменений задержка растёт от base вдвое за шаг, но
+    не выше ceiling. jitter разносит опросы подписчиков во времени.
+    """
+
+    def __init__(self, base, fast, ceiling, jitter=0.1, rand=random.random):
+        """Параметры политики в секундах; jitter - доля от задержки."""
+        self.base = base
+        self.fast = fast
+        self.ceiling = ceiling
+        self.jitter = jitter
+        self.rand = rand
+
+    def backoff(self, steps):
+        """Базовая задержка, удвоенная steps раз."""
+        return self.base * 2 ** min(steps, MAX_EXPONENT)
+
+    def delay(self, cadence, reviewing):
+        """Задержка до следующего опроса в секундах."""
+        if cadence.failures:
+            delay = self.backoff(cadence.failures - 1)
+        elif reviewing:
+            delay = self.fast
+        else:
+            delay = self.backoff(cadence.idle_polls)
+        delay = min(delay, self.ceiling)
+        return delay * (1 + self.jitter * (2 * self.rand() - 1))
+
+
+class DeadlineQueue:
+    """Куча сроков следующего опроса подписок.
+
+    Перенос срока кладёт в кучу новую запись за O(log N), а старая
+    помечается удалённой и отбрасывается при извлечении.
+    """
+
+    def __init__(self):
+        """Пустая очередь."""
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        """Глубина очереди: число запланированных подписок."""
+        return len(self._entries)
+
+    def schedule(self, key, item, due):
+        """Постановка или перенос срока опроса подписки."""
+        self.remove(key)
+        entry = [due, next(self._counter), key, item]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, key):
+        """Снятие подписки с расписания."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[2] = None
+
+    def _drop_removed(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Ближайший срок или None, если очередь пуста."""
+        self._drop_removed()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Извлечение всех подписок, срок которых наступил."""
+        items = []
+        self._drop_removed()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, key, item = heapq.heappop(self._heap)
+            del self._entries[key]
+            items.append(item)
+            self._drop_removed()
+        return items
+
+    def wait_time(self, now):
+        """Сколько секунд спать до ближайшего срока; None - без срока."""
+        due = self.next_due()
+        if due is None:
+            return None
+        return max(due - now, 0.0)
+
+    def lag(self, now):
+        """Насколько просрочен ближайший опрос, в секундах."""
+        due = self.next_due()
+        if due is None:
+            return 0.0
+        return max(now - due, 0.0)
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from logs import Lazy
+from metrics import Histogram, timed
+from ratelimit import TokenBucket
+
+GLOBAL_RATE = 30
+CHAT_RATE = 1
+MESSAGE_LIMIT = 4096
+SEPARATOR = '\n\n'
+RETRY_BASE = 1
+RETRY_MAX = 60
+MSG_SUCCESS = 'Сообщение {0} отправлено!'
+MSG_FAIL = 'Сообщение {0} не отправлено: {1}.'
+MSG_RETRY = 'Telegram просит подождать {0} с. перед отправкой в чат {1}.'
+MSG_TRANSIENT = 'Telegram недоступен, повтор через {0} с.: {1}.'
+MSG_CRASH = 'Сбой отправки в чат {0}: {1}.'
+MSG_REPLAY = 'Из журнала исходящих повторно поставлено сообщений: {0}.'
+QUEUED = 'queued'
+SENT = 'sent'
+FAILED = 'failed'
+
+logger = logging.getLogger(__name__)
+SEND_SECONDS = Histogram(
+    'homework_send_seconds', 'Отправка сообщений в Telegram.', ('outcome',))
+
+
+def take_batch(texts, limit=MESSAGE_LIMIT):
+    """Склейка подряд идущих сообщений чата в одно не длиннее limit.
+
+    Возвращает текст и число склеенных сообщений.
+    """
+    batch = texts[0]
+    count = 1
+    for text in texts[1:]:
+        if len(batch) + len(SEPARATOR) + len(text) > limit:
+            break
+        batch += SEPARATOR + text
+        count += 1
+    return batch, count
+
+
+def is_transient(error):
+    """Временный ли сбой Telegram: сеть и таймауты, но не BadRequest."""
+    import telegram
+
+    return (isinstance(error, telegram.error.NetworkError)
+            and not isinstance(error, telegram.error.BadRequest))
+
+
+def retry_delay(attempts, base=RETRY_BASE, limit=RETRY_MAX):
+    """Пауза перед повтором после attempts неудачных попыток."""
+    return min(base * 2 ** (attempts - 1), limit)
+
+
+class Delivery:
+    """Доставка одного сообщения в один чат и её итог."""
+
+    __slots__ = ('chat_id', 'text', 'key', 'status', 'error', 'attempts')
+
+    def __init__(self, chat_id, text, key=None):
+        """Доставка в очереди; key - ключ записи в журнале исходящих."""
+        self.chat_id = chat_id
+        self.text = text
+        self.key = key
+        self.status = QUEUED
+        self.error = None
+        self.attempts = 0
+
+    def finish(self, status, error=None):
+        """Фиксация итога попытки отправки."""
+        self.attempts += 1
+        self.status = status
+        self.error = error
+
+    def __repr__(self):
+        """Представление для журнала."""
+        return f'Delivery({self.chat_id!r}, {self.status!r})'
+
+
+class SendQueue:
+    """Исходящая очередь Telegram с ограничением частоты отправки.
+
+    Опрос только кладёт сообщения в очередь, отправляет их отдельный
+    поток. Перед отправкой поток ждёт токены общей корзины и корзины
+    чата, а сообщения, накопившиеся за это время, склеивает в одно.
+    С журналом outbox уведомления сначала записываются в него,
+    а итог отправки отмечается там же.
+    """
+
+    def __init__(self, bot, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE,
+                 sleep=time.sleep, outbox=None):
+        """Очередь для бота с лимитами Telegram по умолчанию."""
+        self.bot = bot
+        self.outbox = outbox
+        self.chat_rate = chat_rate
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_buckets = {}
+        self.pending = OrderedDict()
+        self.outcomes = Counter()
+        self.sleep = sleep
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def __len__(self):
+        """Число сообщений, ожидающих отправки."""
+        with self.condition:
+            return sum(len(batch) for batch in self.pending.values())
+
+    def put(self, chat_id, text, key=None):
+        """Постановка сообщения в очередь без ожидания отправки."""
+        delivery = Delivery(chat_id, text, key)
+        with self.condition:
+            self.pending.setdefault(chat_id, []).append(delivery)
+            self.condition.notify()
+        return delivery
+
+    async def send(self, chat_id, text, key=None):
+        """Асинхронная отправка для движка опроса: только постановка."""
+        return self.put(chat_id, text, key)
+
+    async def send_all(self, tenant_key, entries):
+        """Постановка уведомлений (key, chat_id, text) токена tenant_key.
+
+        Уведомления сначала одной транзакцией пишутся в журнал; те,
+        что уже были в нём, повторно не ставятся.
+        """
+        if self.outbox is not None:
+            added = await asyncio.get_running_loop().run_in_executor(
+                None, self.outbox.add, tenant_key, entries)
+            entries = [entry for entry in entries if entry[0] in added]
+        return [self.put(chat_id, text, key) for key, chat_id, text in entries]
+
+    def replay(self, tenant_keys=None):
+        """Повторная постановка неотправленных записей журнала."""
+        if self.outbox is None:
+            return 0
+        pending = self.outbox.pending(tenant_keys)
+        for key, chat_id, text in pending:
+            self.put(chat_id, text, key)
+        logger.info(Lazy(MSG_REPLAY, len(pending)))
+        return len(pending)
+
+    def set_rates(self, global_rate, chat_rate):
+        """Новые лимиты отправки; корзины чатов создаются заново."""
+        with self.condition:
+            self.global_bucket = TokenBucket(global_rate)
+            self.chat_rate = chat_rate
+            self.chat_buckets = {}
+
+    def chat_bucket(self, chat_id):
+        """Корзина токенов отдельного чата."""
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, 1)
+        return self.chat_buckets[chat_id]
+
+    def next_chat(self):
+        """Чат, дольше всех ждущий отправки; None после остановки."""
+        with self.condition:
+            while self.running and not self.pending:
+                self.condition.wait()
+            if not self.pending:
+                return None
+            return next(iter(self.pending))
+
+    def take(self, chat_id):
+        """Извлечение склеенной пачки сообщений чата и её доставок."""
+        with self.condition:
+            deliveries = self.pending.pop(chat_id)
+            batch, count = take_batch(
+                [delivery.text for delivery in deliveries])
+            if count < len(deliveries):
+                self.pending[chat_id] = deliveries[count:]
+            return batch, deliveries[:count]
+
+    def requeue(self, chat_id, deliveries):
+        """Возврат неотправленных сообщений в начало очереди чата."""
+        with self.condition:
+            deliveries = deliveries + self.pending.pop(chat_id, [])
+            self.pending[chat_id] = deliveries
+            self.pending.move_to_end(chat_id, last=False)
+
+    def finish(self, deliveries, status, error=None):
+        """Фиксация итога для каждой доставки пачки."""
+        for delivery in deliveries:
+            delivery.finish(status, error)
+        self.outcomes[status] += len(deliveries)
+        keys = [delivery.key for delivery in deliveries
+                if delivery.key is not None]
+        if self.outbox is not None and keys and status != QUEUED:
+            self.outbox.finish(keys, status)
+
+    def postpone(self, chat_id, deliveries, error):
+        """Повтор пачки после временного сбоя с растущей паузой.
+
+        Во время остановки пачка не возвращается в очередь: в журнале
+        она остаётся queued и уйдёт после следующего запуска.
+        """
+        self.finish(deliveries, QUEUED, error)
+        if not self.running:
+            return
+        delay = retry_delay(deliveries[0].attempts)
+        logger.warning(Lazy(MSG_TRANSIENT, delay, error))
+        self.requeue(chat_id, deliveries)
+        self.sleep(delay)
+
+    def deliver(self, chat_id):
+        """Отправка одной пачки с учётом лимитов и retry_after.
+
+        Итог failed окончателен только для постоянных ошибок вроде
+        BadRequest и Unauthorized; сетевые сбои повторяются.
+        """
+        import telegram
+
+        self.sleep(max(
+            self.global_bucket.reserve(),
+            self.chat_bucket(chat_id).reserve()))
+        batch, deliveries = self.take(chat_id)
+        try:
+            with timed(SEND_SECONDS):
+                self.bot.send_message(chat_id, batch)
+            logger.info(Lazy(MSG_SUCCESS, batch))
+            self.finish(deliveries, SENT)
+        except telegram.error.RetryAfter as error:
+            logger.warning(Lazy(MSG_RETRY, error.retry_after, chat_id))
+            self.finish(deliveries, QUEUED, error)
+            self.requeue(chat_id, deliveries)
+            self.sleep(error.retry_after)
+        except telegram.TelegramError as error:
+            if is_transient(error):
+                self.postpone(chat_id, deliveries, error)
+                return
+            logger.exception(Lazy(MSG_FAIL, batch, error))
+            self.finish(deliveries, FAILED, error)
+
+    def work(self):
+        """Цикл потока отправки.
+
+        Непредвиденная ошибка одной пачки, например журнала outbox,
+        не останавливает поток: она записывается в журнал, а записи
+        outbox, оставшиеся queued, уйдут при следующем replay.
+        """
+        while True:
+            chat_id = self.next_chat()
+            if chat_id is None:
+                return
+            try:
+                self.deliver(chat_id)
+            except Exception as error:
+                logger.exception(Lazy(MSG_CRASH, chat_id, error))
+                self.sleep(RETRY_BASE)
+
+    def start(self):
+        """Запуск потока отправки."""
+        self.running = True
+        self.thread = threading.Thread(
+            target=self.work, name='telegram-sender', daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """Остановка после отправки уже поставленных сообщений."""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
@@ -0,0 +1,156 @@
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import signal
+import time
+from multiprocessing.connection import wait
+
+from logs import Lazy
+
+REPLICAS = 64
+RESTART_DELAY = 1
+MAX_RESTART_DELAY = 60
+STOP_TIMEOUT = 30
+WORKER_STARTED = 'Шард {0} из {1} запущен, pid {2}.'
+WORKER_DIED = 'Шард {0} завершился с кодом {1}, перезапуск через {2} с.'
+RESIZED = 'Число шардов изменено: {0} -> {1}.'
+
+logger = logging.getLogger(__name__)
+
+
+def point(value):
+    """Положение значения на кольце."""
+    return int(hashlib.sha256(value.encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    """Согласованное хеширование ключей подписчиков на shards шардов.
+
+    У каждого шарда replicas виртуальных точек на кольце, ключ
+    достаётся первой точке по часовой стрелке. При изменении числа
+    шардов переезжает только около 1/shards ключей.
+    """
+
+    def __init__(self, shards, replicas=REPLICAS):
+        """Кольцо из шардов 0..shards-1."""
+        self.shards = shards
+        ring = sorted(
+            (point(f'{shard}:{replica}'), shard)
+            for shard in range(shards) for replica in range(replicas))
+        self.points = [position for position, _ in ring]
+        self.owners = [shard for _, shard in ring]
+
+    def shard_of(self, key):
+        """Номер шарда для ключа."""
+        index = bisect.bisect(self.points, point(key)) % len(self.points)
+        return self.owners[index]
+
+
+def select_shard(tenants, shard, shards):
+    """Подписчики, которые опрашивает шард shard из shards."""
+    ring = HashRing(shards)
+    return [tenant for tenant in tenants if ring.shard_of(tenant.key) == shard]
+
+
+class Supervisor:
+    """Процессы-шарды: запуск, перезапуск упавших и смена их числа.
+
+    target(shard, shards) выполняется в отдельном процессе для каждого
+    шарда. SIGTTIN добавляет шард, SIGTTOU убирает, SIGTERM и SIGINT
+    останавливают всех; при смене числа шарды перезапускаются, чтобы
+    заново поделить подписчиков по кольцу.
+    """
+
+    def __init__(self, target, shards, restart_delay=RESTART_DELAY,
+                 context=None):
+        """Супервизор shards процессов; context - контекст multiprocessing."""
+        self.target = target
+        self.shards = shards
+        self.wanted = shards
+        self.restart_delay = restart_delay
+        self.context = context or multiprocessing.get_context('spawn')
+        self.workers = {}
+        self.restarts = {}
+        self.due = {}
+        self.running = False
+
+    def spawn(self, shard):
+        """Запуск процесса шарда."""
+        process = self.context.Process(
+            target=self.target, args=(shard, self.shards),
+            name=f'shard-{shard}')
+        process.start()
+        self.workers[shard] = process
+        logger.info(Lazy(WORKER_STARTED, shard, self.shards, process.pid))
+
+    def start(self):
+        """Запуск всех шардов."""
+        self.running = True
+        for shard in range(self.shards):
+            self.spawn(shard)
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Остановка шардов по SIGTERM; зависшие завершаются принудительно."""
+        for process in self.workers.values():
+            process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.workers.values():
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.workers.clear()
+        self.due.clear()
+
+    def resize(self, shards):
+        """Новое число шардов и перераспределение подписчиков."""
+        logger.info(Lazy(RESIZED, self.shards, shards))
+        self.stop()
+        self.shards = shards
+        self.restarts.clear()
+        self.start()
+
+    def reap(self, now):
+        """Учёт упавших шардов и перезапуск тех, чья пауза истекла."""
+        for shard, process in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            del self.workers[shard]
+            self.restarts[shard] = self.restarts.get(shard, 0) + 1
+            delay = min(
+                self.restart_delay * 2 ** (self.restarts[shard] - 1),
+                MAX_RESTART_DELAY)
+            logger.error(Lazy(WORKER_DIED, shard, process.exitcode, delay))
+            self.due[shard] = now + delay
+        for shard, due in list(self.due.items()):
+            if due <= now:
+                del self.due[shard]
+                self.spawn(shard)
+
+    def request(self, change):
+        """Обработчик сигнала: желаемое число шардов меняется на change."""
+        def handler(signum, frame):
+            self.wanted = max(1, self.wanted + change)
+        return handler
+
+    def shutdown(self, signum, frame):
+        """Обработчик сигнала остановки."""
+        self.running = False
+
+    def run(self, poll=1):
+        """Цикл супервизора до SIGTERM или SIGINT."""
+        signal.signal(signal.SIGTTIN, self.request(+1))
+        signal.signal(signal.SIGTTOU, self.request(-1))
+        signal.signal(signal.SIGTERM, self.shutdown)
+        signal.signal(signal.SIGINT, self.shutdown)
+        self.start()
+        try:
+            while self.running:
+                wait([process.sentinel
+                      for process in self.workers.values()], poll)
+                if self.wanted != self.shards:
+                    self.resize(self.wanted)
+                self.reap(time.monotonic())
+        finally:
+            self.stop()
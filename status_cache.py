@@ -0,0 +1,71 @@
+from collections import OrderedDict
+
+from records import to_status
+
+STATUS_CACHE_SIZE = 1000
+
+
+def homework_key(record):
+    """Ключ работы в индексе - homework_name, как в сообщениях бота."""
+    return record.name
+
+
+class StatusIndex:
+    """Последние объявленные статусы работ с вытеснением LRU."""
+
+    def __init__(self, maxsize=STATUS_CACHE_SIZE):
+        """Пустой индекс не больше maxsize работ."""
+        self.maxsize = maxsize
+        self._statuses = OrderedDict()
+
+    def __len__(self):
+        """Число работ в индексе."""
+        return len(self._statuses)
+
+    def __getitem__(self, key):
+        """Последний статус работы по ключу."""
+        return self._statuses[key]
+
+    def get(self, key, default=None):
+        """Последний статус работы или default."""
+        return self._statuses.get(key, default)
+
+    def has_status(self, status):
+        """Есть ли в индексе работа с данным статусом."""
+        return status in self._statuses.values()
+
+    def changed(self, record):
+        """Отличается ли статус работы от уже объявленного."""
+        key = homework_key(record)
+        if self._statuses.get(key) != record.status:
+            return True
+        self._statuses.move_to_end(key)
+        return False
+
+    def changes(self, records):
+        """Работы пачки, статус которых действительно изменился."""
+        return [record for record in records if self.changed(record)]
+
+    def remember(self, record):
+        """Запоминание объявленного статуса работы."""
+        self.set(homework_key(record), record.status)
+
+    def set(self, key, status):
+        """Запись статуса с вытеснением самых старых работ."""
+        self._statuses[key] = status
+        self._statuses.move_to_end(key)
+        while len(self._statuses) > self.maxsize:
+            self._statuses.popitem(last=False)
+
+    def update(self, statuses):
+        """Загрузка статусов, например из контрольной точки."""
+        for key, status in statuses.items():
+            self.set(key, to_status(status))
+
+    def items(self):
+        """Пары (homework_name, статус), от давних к свежим."""
+        return list(self._statuses.items())
+
+    def to_dict(self):
+        """Статусы для сохранения в контрольной точке."""
+        return dict(self._statuses)
@@ -0,0 +1,100 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+STREAM_TYPE_FAIL = 'Ответ API должен быть объектом JSON, получено: {0!r}'
+STREAM_SYNTAX_FAIL = 'Ожидался символ {0!r}, получено: {1!r}'
+
+
+class HomeworkStream:
+    """Потоковый разбор ответа API: работы из homeworks по одной.
+
+    Документ читается из итератора байтовых кусков. В памяти держится
+    только текущий кусок и разбираемая запись, поэтому расход памяти
+    не зависит от длины истории. Остальные ключи верхнего уровня
+    (current_date, code, error) собираются в meta.
+    """
+
+    def __init__(self, chunks):
+        """Разбор кусков chunks, например response.iter_content()."""
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.meta = {}
+        self.has_homeworks = False
+
+    def fill(self):
+        """Чтение следующего куска; False, если документ закончился."""
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        """Следующий значимый символ или '' в конце документа."""
+        while True:
+            while (self.pos < len(self.buffer)
+                    and self.buffer[self.pos] in WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """Пропуск обязательного символа разметки."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(STREAM_SYNTAX_FAIL.format(char, found))
+        self.pos += 1
+
+    def value(self):
+        """Разбор одного значения JSON, дочитывая куски при нехватке."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(
+                    self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self):
+        """Элементы массива по одному."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+    def __iter__(self):
+        """Работы из homeworks; остальные ключи попадают в meta."""
+        if self.peek() != '{':
+            raise TypeError(STREAM_TYPE_FAIL.format(self.peek()))
+        self.pos += 1
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            if key == 'homeworks' and self.peek() == '[':
+                self.has_homeworks = True
+                yield from self.array()
+            else:
+                self.meta[key] = self.value()
+            if self.peek() == '}':
+                return
+            self.expect(',')
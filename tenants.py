@@ -0,0 +1,126 @@
+import hashlib
+import json
+import sqlite3
+
+from incidents import Incident
+from messages import DEFAULT_LOCALE
+from scheduler import Cadence
+from status_cache import StatusIndex
+
+TENANT_KEYS = ('practicum_token', 'chat_id')
+TENANT_KEYS_FAIL = 'В записи подписчика нет ключей: {0}.'
+TENANTS_TYPE_FAIL = 'Реестр подписчиков должен быть списком. Тип - {0}'
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+SELECT_TENANTS = 'SELECT practicum_token, chat_id{0} FROM tenants'
+TABLE_COLUMNS = 'PRAGMA table_info(tenants)'
+
+
+class Subscriber:
+    """Чат Telegram, получающий статусы работ, и его локаль."""
+
+    __slots__ = ('chat_id', 'locale')
+
+    def __init__(self, chat_id, locale=DEFAULT_LOCALE):
+        """Подписчик с локалью по умолчанию."""
+        self.chat_id = chat_id
+        self.locale = locale
+
+    def __repr__(self):
+        """Представление для журнала."""
+        return f'Subscriber({self.chat_id!r}, {self.locale!r})'
+
+
+class Tenant:
+    """Токен Практикума и все чаты, подписанные на его статусы.
+
+    API опрашивается один раз на токен, а результат рассылается
+    каждому подписчику.
+    """
+
+    __slots__ = (
+        'practicum_token', 'subscribers', 'timestamp', 'statuses', 'cadence',
+        'incident')
+
+    def __init__(self, practicum_token, subscribers=(), timestamp=None):
+        """Токен начинает без отметки времени опроса."""
+        self.practicum_token = practicum_token
+        self.subscribers = list(subscribers)
+        self.timestamp = timestamp
+        self.statuses = StatusIndex()
+        self.cadence = Cadence()
+        self.incident = Incident()
+
+    def subscribe(self, chat_id, locale=DEFAULT_LOCALE):
+        """Добавление чата; повторная подписка меняет только локаль."""
+        for subscriber in self.subscribers:
+            if subscriber.chat_id == chat_id:
+                subscriber.locale = locale
+                return subscriber
+        subscriber = Subscriber(chat_id, locale)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    @property
+    def key(self):
+        """Ключ токена в контрольной точке без самого токена."""
+        return hashlib.sha256(
+            str(self.practicum_token).encode()).hexdigest()[:16]
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API Практикума."""
+        return {'Authorization': f'OAuth {self.practicum_token}'}
+
+    def __repr__(self):
+        """Представление без токена, чтобы он не попал в логи."""
+        return f'Tenant(key={self.key!r}, subscribers={self.subscribers!r})'
+
+
+def group_by_token(rows):
+    """Записи (токен, чат, локаль) реестра, сгруппированные по токену."""
+    tenants = {}
+    for token, chat_id, locale in rows:
+        if token not in tenants:
+            tenants[token] = Tenant(token)
+        tenants[token].subscribe(chat_id, locale)
+    return list(tenants.values())
+
+
+def row_from_dict(record):
+    """Запись реестра в виде (токен, чат, локаль)."""
+    lost_keys = [key for key in TENANT_KEYS if key not in record]
+    if lost_keys:
+        raise KeyError(TENANT_KEYS_FAIL.format(lost_keys))
+    return (
+        record['practicum_token'], record['chat_id'],
+        record.get('locale', DEFAULT_LOCALE))
+
+
+def load_json_tenants(path):
+    """Чтение реестра подписчиков из JSON-файла."""
+    with open(path, encoding='utf-8') as file:
+        records = json.load(file)
+    if not isinstance(records, list):
+        raise TypeError(TENANTS_TYPE_FAIL.format(type(records)))
+    return group_by_token(row_from_dict(record) for record in records)
+
+
+def load_sqlite_tenants(path):
+    """Чтение реестра подписчиков из таблицы tenants базы SQLite."""
+    connection = sqlite3.connect(path)
+    try:
+        columns = [row[1] for row in connection.execute(TABLE_COLUMNS)]
+        locale = ', locale' if 'locale' in columns else ''
+        rows = connection.execute(SELECT_TENANTS.format(locale)).fetchall()
+    finally:
+        connection.close()
+    return group_by_token(
+        (row[0], row[1], row[2] if locale else DEFAULT_LOCALE)
+        for row in rows)
+
+
+def load_tenants(path):
+    """Загрузка реестра подписчиков из JSON-файла или базы SQLite."""
+    if str(path).endswith(SQLITE_SUFFIXES):
+        return load_sqlite_tenants(path)
+    return load_json_tenants(path)
@@ -0,0 +1,63 @@
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import CircuitOpen
+from utils import Clock
+
+
+class TestCircuitBreaker:
+
+    def make_open(self, clock):
+        breaker = CircuitBreaker(
+            failure_rate=0.5, window=4, min_calls=4, reset_timeout=10,
+            clock=clock)
+        for _ in range(4):
+            breaker.before_call()
+            breaker.record_failure()
+        return breaker
+
+    def test_opens_on_failure_rate(self):
+        breaker = self.make_open(Clock())
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = CircuitBreaker(min_calls=5, clock=Clock())
+        for _ in range(4):
+            breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_half_open_single_probe(self):
+        clock = Clock()
+        breaker = self.make_open(clock)
+        clock.now = 10
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == CLOSED, (
+            'Проверьте, что удачный пробный запрос замыкает автомат'
+        )
+
+    def test_failed_probe_reopens(self):
+        clock = Clock()
+        breaker = self.make_open(clock)
+        clock.now = 10
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+    def test_late_results_keep_probe_time(self):
+        clock = Clock()
+        breaker = self.make_open(clock)
+        clock.now = 5
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state == OPEN and breaker.opened_at == 0, (
+            'Проверьте, что поздние итоги не отодвигают пробный запрос'
+        )
+        clock.now = 10
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
@@ -0,0 +1,87 @@
+from checkpoint import Checkpoint
+from tenants import Tenant
+
+
+class TestCheckpoint:
+
+    def test_save_and_restore(self, tmp_path):
+        path = str(tmp_path / 'checkpoint.json')
+        tenant = Tenant('token', timestamp=500)
+        tenant.statuses.set('hw', 'reviewing')
+        Checkpoint(path).save([tenant])
+
+        restored = Tenant('token')
+        Checkpoint(path).restore([restored], default_timestamp=0)
+        assert restored.timestamp == 500, (
+            'Проверьте, что опрос продолжается с сохранённого current_date'
+        )
+        assert restored.statuses.to_dict() == {'hw': 'reviewing'}, (
+            'Проверьте, что последние статусы восстанавливаются'
+        )
+        assert 'token' not in open(path).read(), (
+            'Проверьте, что токен не записывается в контрольную точку'
+        )
+
+    def test_missing_file_uses_default(self, tmp_path):
+        tenant = Tenant('token')
+        Checkpoint(str(tmp_path / 'none.json')).restore([tenant], 42)
+        assert tenant.timestamp == 42
+
+    def test_broken_file_is_ignored(self, tmp_path):
+        path = tmp_path / 'checkpoint.json'
+        path.write_text('{broken')
+        tenant = Tenant('token')
+        Checkpoint(str(path)).restore([tenant], 42)
+        assert tenant.timestamp == 42, (
+            'Проверьте, что повреждённая контрольная точка не мешает запуску'
+        )
+
+    def test_partitions_survive_reshard(self, tmp_path):
+        from checkpoint import PartitionCheckpoint
+
+        path = str(tmp_path / 'checkpoint.json')
+        Checkpoint(path).save([Tenant('first', timestamp=100)])
+        PartitionCheckpoint(path, 0).save([Tenant('second', timestamp=200)])
+
+        moved = Tenant('second')
+        checkpoint = PartitionCheckpoint(path, 1)
+        checkpoint.restore([moved], default_timestamp=0)
+        assert moved.timestamp == 200, (
+            'Проверьте, что после смены шардов токен находит свой раздел'
+        )
+        unsharded = Tenant('first')
+        PartitionCheckpoint(path, 1).restore([unsharded], 0)
+        assert unsharded.timestamp == 100
+        checkpoint.save([moved])
+        assert list(checkpoint.data) == [moved.key], (
+            'Проверьте, что шард пишет в раздел только свои токены'
+        )
+
+    def test_unsharded_restart_reads_partitions(self, tmp_path):
+        from checkpoint import PartitionCheckpoint
+
+        path = str(tmp_path / 'checkpoint.json')
+        Checkpoint(path).save([Tenant('token', timestamp=100)])
+        PartitionCheckpoint(path, 0).save([Tenant('token', timestamp=900)])
+
+        tenant = Tenant('token')
+        Checkpoint(path).restore([tenant], default_timestamp=0)
+        assert tenant.timestamp == 900, (
+            'Проверьте, что без шардов берётся самая поздняя отметка разделов'
+        )
+
+    def test_single_process_saves_on_sigterm(self, monkeypatch):
+        import signal
+
+        import homework
+
+        handlers = {}
+        monkeypatch.setattr(homework, 'SHARDS', 1)
+        monkeypatch.setattr(homework, 'serve', lambda: None)
+        monkeypatch.setattr(
+            homework.signal, 'signal',
+            lambda signum, handler: handlers.update({signum: handler}))
+        homework.main()
+        assert handlers.get(signal.SIGTERM) is homework.stop_shard, (
+            'Проверьте, что без шардов SIGTERM сохраняет контрольную точку'
+        )
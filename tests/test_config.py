@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from config import ConfigWatcher, validate
+from exceptions import ConfigError
+
+DEFAULTS = {
+    'RETRY_TIME': 600, 'REVIEWING_RETRY_TIME': 60, 'MAX_RETRY_TIME': 3600,
+    'RETRY_JITTER': 0.1, 'CATCHUP_AFTER': 7200, 'TIMEOUT': 10.0,
+}
+
+
+def write(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestConfig:
+
+    def test_validate_merges_defaults(self):
+        values = validate({'RETRY_TIME': '300'}, DEFAULTS)
+        assert values['RETRY_TIME'] == 300 and values['TIMEOUT'] == 10.0
+
+    @pytest.mark.parametrize('data', [
+        {'PRACTICUM_TOKEN': 'token'},
+        {'TIMEOUT': -1},
+        {'TIMEOUT': True},
+        {'RETRY_TIME': 30},
+        {'MAX_RETRY_TIME': 7200},
+        {'CATCHUP_AFTER': 3700},
+        ['RETRY_TIME'],
+    ])
+    def test_validate_rejects(self, data):
+        with pytest.raises(ConfigError):
+            validate(data, DEFAULTS)
+
+    @pytest.mark.parametrize('env', [
+        {'RETRY_TIME': 0},
+        {'REVIEWING_RETRY_TIME': 900},
+        {'CATCHUP_AFTER': 3600},
+    ])
+    def test_validate_checks_defaults(self, env):
+        with pytest.raises(ConfigError):
+            validate({}, dict(DEFAULTS, **env))
+
+    def test_defaults_are_valid(self):
+        import homework
+
+        assert validate({}, homework.CONFIG_DEFAULTS), (
+            'Проверьте, что настройки по умолчанию проходят проверку'
+        )
+
+    @pytest.mark.parametrize('name, value', [
+        ('RETRY_TIME', '1.5'), ('TIMEOUT', 'abc'), ('SHARDS', '0'),
+    ])
+    def test_env_strings_are_validated(self, monkeypatch, name, value):
+        import homework
+        from config import SETTINGS, STARTUP_SETTINGS
+
+        for setting in [*SETTINGS, *STARTUP_SETTINGS, 'CONFIG_DEFAULTS']:
+            monkeypatch.setattr(
+                homework, setting, getattr(homework, setting))
+        monkeypatch.setattr(homework, 'CONFIG_FILE', None)
+        homework.load_settings()
+        assert homework.TIMEOUT == 10.0 and homework.SHARDS == 1
+        monkeypatch.setattr(homework, name, value)
+        with pytest.raises(ConfigError):
+            homework.load_settings()
+
+    def test_watcher_applies_only_valid_changes(self, tmp_path):
+        path = tmp_path / 'config.json'
+        write(path, {'RETRY_TIME': 600}, 1_000_000_000)
+        applied = []
+        watcher = ConfigWatcher(str(path), DEFAULTS, applied.append)
+        assert not watcher.check(), (
+            'Проверьте, что неизменившийся файл не применяется повторно'
+        )
+        write(path, {'RETRY_TIME': 300}, 2_000_000_000)
+        assert watcher.check() and applied[-1]['RETRY_TIME'] == 300
+        write(path, {'RETRY_TIME': 'often'}, 3_000_000_000)
+        assert not watcher.check() and len(applied) == 1, (
+            'Проверьте, что файл с ошибкой не меняет настройки'
+        )
+
+    def test_engine_reconfigure(self, monkeypatch):
+        import homework
+
+        engine = homework.PollEngine(None, [])
+        values = dict(homework.CONFIG_DEFAULTS, RETRY_TIME=120,
+                      REQUESTS_PER_SECOND=50.0, BREAKER_WINDOW=5)
+        for name in values:
+            monkeypatch.setattr(homework, name, values[name])
+        engine.reconfigure()
+        assert engine.policy.base == 120, (
+            'Проверьте, что новые интервалы опроса применяются на ходу'
+        )
+        assert engine.quota.ceiling == 50.0
+        assert engine.breaker.results.maxlen == 5
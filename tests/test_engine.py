@@ -0,0 +1,231 @@
+import asyncio
+import json
+import time
+
+from breaker import CLOSED
+from messages import render_verdict
+from tenants import Subscriber, Tenant
+from utils import Bot, DirectSender
+
+
+class TestPollEngine:
+
+    def test_poll_reschedules_tenant(self, monkeypatch):
+        import homework
+
+        def mock_request_api(headers, current_timestamp, session=None):
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'reviewing'}],
+                'current_date': 100,
+            }
+
+        monkeypatch.setattr(homework, 'request_api', mock_request_api)
+        bot = Bot()
+        tenant = Tenant(
+            'token', [Subscriber(1), Subscriber(2, 'en')],
+            timestamp=int(time.time()))
+        engine = homework.PollEngine(None, [tenant])
+
+        async def poll():
+            engine.semaphore = asyncio.Semaphore(1)
+            engine.sender = DirectSender(bot, engine.semaphore)
+            engine.wakeup = asyncio.Event()
+            await engine.poll(tenant)
+
+        asyncio.run(poll())
+        assert sorted(bot.sent) == [
+            (1, render_verdict('hw', 'reviewing', 'ru')),
+            (2, render_verdict('hw', 'reviewing', 'en')),
+        ], 'Проверьте, что один опрос рассылается всем подписчикам токена'
+        assert engine.queue_depth() == 1, (
+            'Проверьте, что после опроса подписчик снова в расписании'
+        )
+        assert engine.queue.wait_time(0) > 0
+
+    def test_throttled_poll_slows_down(self, monkeypatch):
+        import homework
+        from exceptions import Throttled
+
+        calls = []
+
+        def mock_request_api(headers, current_timestamp, session=None):
+            calls.append(current_timestamp)
+            raise Throttled('429', retry_after=30)
+
+        monkeypatch.setattr(homework, 'request_api', mock_request_api)
+        bot = Bot()
+        tenant = Tenant('token', [Subscriber(1)], timestamp=int(time.time()))
+        engine = homework.PollEngine(None, [tenant])
+
+        async def poll():
+            engine.semaphore = asyncio.Semaphore(1)
+            engine.sender = DirectSender(bot, engine.semaphore)
+            engine.wakeup = asyncio.Event()
+            await engine.poll(tenant)
+            await engine.poll(tenant)
+
+        asyncio.run(poll())
+        assert engine.quota.rate_share() == 0.5, (
+            'Проверьте, что после 429 общая скорость запросов снижается'
+        )
+        assert len(calls) == 1 and engine.quota.deferred[tenant.key] == 1, (
+            'Проверьте, что до истечения Retry-After опрос переносится'
+        )
+        assert engine.queue.wait_time(0) > 0
+        assert engine.breaker.state == CLOSED, (
+            'Проверьте, что 429 не размыкает общий автомат'
+        )
+        assert bot.sent == [], (
+            'Проверьте, что о 429 подписчикам не сообщается'
+        )
+
+    def test_catch_up_sends_one_digest_per_chat(self, monkeypatch):
+        import homework
+
+        def mock_request_api(headers, current_timestamp, session=None):
+            return {
+                'homeworks': [
+                    {'homework_name': f'hw{index}', 'status': 'approved',
+                     'date_updated': f'2021-10-0{index}T10:00:00Z'}
+                    for index in range(1, 6)
+                ],
+                'current_date': 100,
+            }
+
+        monkeypatch.setattr(homework, 'request_api', mock_request_api)
+        bot = Bot()
+        tenant = Tenant(
+            'token', [Subscriber(1), Subscriber(2, 'en')],
+            timestamp=int(time.time()) - homework.CATCHUP_AFTER - 1)
+
+        async def poll():
+            semaphore = asyncio.Semaphore(1)
+            await homework.async_poll_tenant(
+                semaphore, DirectSender(bot, semaphore), tenant)
+
+        asyncio.run(poll())
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2], (
+            'Проверьте, что после простоя каждый чат получает одну сводку'
+        )
+        assert all('hw5' in text for _, text in bot.sent)
+
+    def test_error_notice_hides_token(self):
+        import homework
+        import requests
+
+        class RefusingSession:
+
+            def get(self, *args, **kwargs):
+                raise requests.ConnectionError('Connection refused')
+
+        bot = Bot()
+        token = 'y0_AgAAAAsecretPracticumToken'
+        tenant = Tenant(
+            token, [Subscriber(1), Subscriber(2, 'en')],
+            timestamp=int(time.time()))
+
+        async def poll():
+            semaphore = asyncio.Semaphore(1)
+            await homework.async_poll_tenant(
+                semaphore, DirectSender(bot, semaphore), tenant,
+                RefusingSession())
+
+        asyncio.run(poll())
+        assert sorted(chat for chat, _ in bot.sent) == [1, 2]
+        assert not any(token in text for _, text in bot.sent), (
+            'Проверьте, что токен Практикума не попадает в оповещения'
+        )
+
+    def test_open_circuit_continues_incident(self, monkeypatch):
+        import homework
+        from exceptions import CircuitOpen
+
+        errors = [ConnectionError('refused'), CircuitOpen('open'),
+                  CircuitOpen('open'), ConnectionError('refused'),
+                  CircuitOpen('open')]
+
+        def mock_request_api(headers, current_timestamp, session=None):
+            raise errors.pop(0)
+
+        monkeypatch.setattr(homework, 'request_api', mock_request_api)
+        bot = Bot()
+        tenant = Tenant('token', [Subscriber(1)], timestamp=int(time.time()))
+
+        async def poll():
+            semaphore = asyncio.Semaphore(1)
+            sender = DirectSender(bot, semaphore)
+            for _ in range(5):
+                await homework.async_poll_tenant(semaphore, sender, tenant)
+
+        asyncio.run(poll())
+        assert len(bot.sent) == 1, (
+            'Проверьте, что разомкнутый автомат не начинает новый сбой'
+        )
+
+    def test_client_errors_keep_breaker_closed(self):
+        import homework
+        from breaker import CircuitBreaker
+        from exceptions import CircuitOpen, ServerError, WrongStatus
+
+        breaker = CircuitBreaker(min_calls=2, window=2)
+
+        async def fail(error):
+            raise error
+
+        async def calls(error):
+            for _ in range(2):
+                try:
+                    await homework.call_with_breaker(breaker, fail, error)
+                except (WrongStatus, CircuitOpen):
+                    pass
+
+        asyncio.run(calls(WrongStatus('401')))
+        assert breaker.state == CLOSED, (
+            'Проверьте, что ответы 4xx не размыкают общий автомат'
+        )
+        asyncio.run(calls(ServerError('502')))
+        assert breaker.state != CLOSED
+
+    def test_stream_backfill_ignores_stale_history(self):
+        import homework
+
+        data = {
+            'homeworks': [
+                {'homework_name': 'hw', 'status': 'rejected',
+                 'date_updated': '2021-10-05T10:00:00Z'},
+                {'homework_name': 'hw', 'status': 'reviewing',
+                 'date_updated': '2021-10-03T10:00:00Z'},
+            ],
+            'current_date': 100,
+        }
+
+        class Response:
+            status_code = 200
+            headers = {}
+
+            def iter_content(self, size):
+                return [json.dumps(data).encode()]
+
+        class Session:
+
+            def get(self, url, **kwargs):
+                assert kwargs.get('stream') is True
+                return Response()
+
+        bot = Bot()
+        tenant = Tenant(
+            'token', [Subscriber(1)],
+            timestamp=int(time.time()) - homework.STREAM_AFTER - 1)
+        tenant.statuses.set('hw', 'rejected')
+
+        async def poll():
+            semaphore = asyncio.Semaphore(1)
+            await homework.async_poll_tenant(
+                semaphore, DirectSender(bot, semaphore), tenant, Session())
+
+        asyncio.run(poll())
+        assert bot.sent == [], (
+            'Проверьте, что старая запись истории не объявляется заново'
+        )
+        assert not tenant.statuses.has_status('reviewing')
+        assert tenant.timestamp == 100
@@ -0,0 +1,55 @@
+from exceptions import WrongStatus
+from incidents import Incident, fingerprint
+from messages import render
+from utils import Clock
+
+
+class TestIncident:
+
+    def test_fingerprint_ignores_volatile_parts(self):
+        first = WrongStatus("500, Params{'from_date': 1}")
+        second = WrongStatus("500, Params{'from_date': 2}")
+        assert fingerprint(first) == fingerprint(second), (
+            'Проверьте, что from_date не меняет отпечаток ошибки'
+        )
+        assert fingerprint(first) != fingerprint(ConnectionError('500'))
+
+    def test_fingerprint_ignores_object_addresses(self):
+        template = (
+            "HTTPSConnectionPool(host='practicum.yandex.ru', port=443): "
+            'Max retries exceeded with url: /api/user_api/homework_statuses/'
+            '?from_date={0} (Caused by NewConnectionError('
+            "'<urllib3.connection.HTTPSConnection object at {1}>: "
+            'Failed to establish a new connection: '
+            "[Errno 111] Connection refused'))"
+        )
+        first = ConnectionError(template.format(1, '0x7f8b8c0b4e50'))
+        second = ConnectionError(template.format(2, '0x7fa1dd3c9be0'))
+        assert fingerprint(first) == fingerprint(second), (
+            'Проверьте, что адрес объекта соединения не меняет отпечаток'
+        )
+
+    def test_repeats_are_suppressed_until_window(self):
+        clock = Clock()
+        incident = Incident(window=100, clock=clock)
+        error = WrongStatus('500')
+        assert incident.failure(error).text('ru') == (
+            render('program_error', 'ru', error)
+        )
+        assert incident.failure(error) is None, (
+            'Проверьте, что повторная ошибка не отправляется'
+        )
+        clock.now = 100
+        summary = incident.failure(error)
+        assert summary is not None and '3' in summary.text('en'), (
+            'Проверьте, что после окна приходит сводка с числом повторов'
+        )
+
+    def test_recovery_notice_once(self):
+        incident = Incident()
+        assert incident.recovery() is None
+        incident.failure(WrongStatus('500'))
+        assert incident.recovery() is not None, (
+            'Проверьте, что окончание сбоя сообщается'
+        )
+        assert incident.recovery() is None
@@ -0,0 +1,55 @@
+import json
+import logging
+import queue
+
+from logs import JsonFormatter, Lazy, LazyQueueHandler, SampleFilter
+from utils import Clock
+
+
+def make_record(msg, *args, exc_info=None):
+    return logging.LogRecord(
+        'homework', logging.INFO, __file__, 1, msg, args, exc_info)
+
+
+class TestLogs:
+
+    def test_token_redacted(self):
+        formatter = JsonFormatter(secrets=['tg-secret'])
+        record = make_record(Lazy(
+            'Сбой: {0} {1}', {'Authorization': 'OAuth y0_AgAAAA-secret'},
+            'tg-secret'))
+        data = json.loads(formatter.format(record))
+        assert 'y0_AgAAAA-secret' not in data['message'], (
+            'Проверьте, что OAuth-токен не попадает в журнал'
+        )
+        assert 'tg-secret' not in data['message']
+        assert data['level'] == 'INFO' and data['logger'] == 'homework'
+
+    def test_lazy_format(self):
+        class Loud:
+            calls = 0
+
+            def __str__(self):
+                Loud.calls += 1
+                return 'loud'
+
+        handler = LazyQueueHandler(queue.Queue())
+        handler.handle(make_record(Lazy('{0}', Loud())))
+        assert Loud.calls == 0, (
+            'Проверьте, что сообщение не форматируется в потоке опроса'
+        )
+        record = handler.queue.get_nowait()
+        assert record.getMessage() == 'loud'
+
+    def test_sampling(self):
+        clock = Clock()
+        sample = SampleFilter(['Список работ пуст.'], 60, clock)
+        passed = [sample.filter(make_record('Список работ пуст.'))
+                  for _ in range(5)]
+        assert passed == [True, False, False, False, False], (
+            'Проверьте, что повторы сообщения прореживаются'
+        )
+        assert sample.filter(make_record('Другое'))
+        clock.now = 61
+        record = make_record('Список работ пуст.')
+        assert sample.filter(record) and record.suppressed == 4
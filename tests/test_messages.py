@@ -0,0 +1,58 @@
+import json
+
+import messages
+from records import Status
+from tenants import load_tenants
+
+
+class TestMessages:
+
+    def test_catalogs_have_same_keys(self):
+        reference = messages.CATALOG[messages.DEFAULT_LOCALE]
+        for locale, table in messages.CATALOG.items():
+            assert table.keys() == reference.keys(), (
+                f'Проверьте, что в локали {locale} есть все сообщения'
+            )
+            assert table['verdicts'].keys() == set(Status)
+
+    def test_render_verdict_per_locale(self):
+        ru = messages.render_verdict('hw', Status.APPROVED, 'ru')
+        en = messages.render_verdict('hw', Status.APPROVED, 'en')
+        assert ru.startswith('Изменился статус проверки работы "hw"')
+        assert en != ru and '"hw"' in en
+
+    def test_render_verdict_is_memoized(self):
+        messages.render_verdict.cache_clear()
+        for _ in range(3):
+            messages.render_verdict('hw', Status.REJECTED, 'en')
+        assert messages.render_verdict.cache_info().hits == 2, (
+            'Проверьте, что одинаковые сообщения собираются один раз'
+        )
+
+    def test_unknown_locale_falls_back(self):
+        assert messages.render('program_error', 'xx', 'boom') == (
+            messages.render('program_error', messages.DEFAULT_LOCALE, 'boom')
+        )
+
+    def test_tenant_locale_from_registry(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'practicum_token': 't', 'chat_id': 1, 'locale': 'en'},
+            {'practicum_token': 't', 'chat_id': 2},
+        ]))
+        tenant, = load_tenants(str(path))
+        assert [subscriber.locale for subscriber in tenant.subscribers] == [
+            'en', 'ru'
+        ]
+
+    def test_digest_splits_by_limit(self):
+        from records import Homework
+
+        records = [Homework(f'hw{index:02d}', Status.APPROVED)
+                   for index in range(40)]
+        parts = messages.render_digest(records, 'ru', 500)
+        assert len(parts) > 1 and all(
+            len(text) <= 500 for _, text in parts), (
+            'Проверьте, что длинная сводка делится на сообщения до лимита'
+        )
+        assert [record for part, _ in parts for record in part] == records
@@ -0,0 +1,64 @@
+from urllib.request import urlopen
+
+import pytest
+
+from metrics import Gauge, Histogram, Registry, start_metrics_server, timed
+
+
+class TestMetrics:
+
+    def test_histogram_buckets(self):
+        registry = Registry()
+        histogram = Histogram(
+            'api_seconds', 'API.', ('outcome',), registry=registry,
+            buckets=(0.1, 1))
+        histogram.observe(0.05, outcome='ok')
+        histogram.observe(0.5, outcome='ok')
+        histogram.observe(5, outcome='ok')
+        text = registry.render()
+        assert 'api_seconds_bucket{outcome="ok",le="0.1"} 1' in text
+        assert 'api_seconds_bucket{outcome="ok",le="1"} 2' in text, (
+            'Проверьте, что корзины гистограммы накопительные'
+        )
+        assert 'api_seconds_bucket{outcome="ok",le="+Inf"} 3' in text
+        assert 'api_seconds_count{outcome="ok"} 3' in text
+        assert '# TYPE api_seconds histogram' in text
+
+    def test_timed_outcome(self):
+        registry = Registry()
+        histogram = Histogram(
+            'send_seconds', 'Send.', ('outcome',), registry=registry)
+        with timed(histogram):
+            pass
+        with pytest.raises(ConnectionError):
+            with timed(histogram):
+                raise ConnectionError
+        assert histogram.count(outcome='ok') == 1
+        assert histogram.count(outcome='ConnectionError') == 1, (
+            'Проверьте, что ошибка учитывается с именем её класса'
+        )
+
+    def test_labeled_gauge(self):
+        registry = Registry()
+        Gauge('quota', 'Quota.', lambda: {'a': 0.5, 'b': 1.0},
+              labels=('token',), registry=registry)
+        text = registry.render()
+        assert 'quota{token="a"} 0.5' in text, (
+            'Проверьте, что значения меток берутся из словаря'
+        )
+        assert 'quota{token="b"} 1.0' in text
+
+    def test_endpoint(self):
+        registry = Registry()
+        Gauge('queue_depth', 'Depth.', lambda: 7, registry=registry)
+        server = start_metrics_server(0, registry, host='127.0.0.1')
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+            with urlopen(url) as response:
+                text = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'queue_depth 7' in text, (
+            'Проверьте, что /metrics отдаёт текущие значения'
+        )
@@ -0,0 +1,69 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from outbox import Outbox
+from sender import SENT, SendQueue
+from tenants import Subscriber, Tenant
+from utils import Bot
+
+
+def homeworks(status):
+    return [{
+        'homework_name': 'hw', 'status': status,
+        'date_updated': '2021-10-12T14:40:57Z',
+    }]
+
+
+class TestOutbox:
+
+    def test_add_is_idempotent(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.db'))
+        entries = [('k1', 1, 'first'), ('k2', 2, 'second')]
+        assert outbox.add('tenant', entries) == {'k1', 'k2'}
+        assert outbox.add('tenant', entries) == set(), (
+            'Проверьте, что запись с тем же ключом не добавляется повторно'
+        )
+        outbox.finish(['k1'], SENT)
+        assert outbox.pending() == [('k2', 2, 'second')]
+        assert outbox.pending({'other'}) == []
+
+    def test_failed_finish_does_not_block_add(self, tmp_path):
+        outbox = Outbox(str(tmp_path / 'outbox.db'))
+        outbox.add('tenant', [('k1', 1, 'first')])
+        with pytest.raises(sqlite3.Error):
+            outbox.finish([object()], SENT)
+        assert outbox.add('tenant', [('k2', 2, 'second')]) == {'k2'}, (
+            'Проверьте, что после ошибки транзакция откатывается'
+        )
+        outbox.finish(['k1'], SENT)
+        assert outbox.pending() == [('k2', 2, 'second')]
+
+    def test_replay_after_crash(self, tmp_path):
+        import homework
+
+        path = str(tmp_path / 'outbox.db')
+        tenant = Tenant('token', [Subscriber(1)])
+        crashed = SendQueue(Bot(), sleep=lambda seconds: None,
+                            outbox=Outbox(path))
+        asyncio.run(homework.notify_changes(
+            crashed, tenant, homeworks('approved')))
+        assert len(crashed) == 1
+
+        bot = Bot()
+        restarted = SendQueue(bot, sleep=lambda seconds: None,
+                              outbox=Outbox(path))
+        assert restarted.replay({tenant.key}) == 1, (
+            'Проверьте, что неотправленное уведомление переживает сбой'
+        )
+        again = Tenant('token', [Subscriber(1)])
+        asyncio.run(homework.notify_changes(
+            restarted, again, homeworks('approved')))
+        restarted.start()
+        restarted.stop(timeout=5)
+        assert len(bot.sent) == 1, (
+            'Проверьте, что повторно найденная смена статуса '
+            'не отправляется дважды'
+        )
+        assert Outbox(path).pending() == []
@@ -0,0 +1,80 @@
+from ratelimit import QuotaManager, TokenBucket
+from utils import Clock
+
+
+class TestTokenBucket:
+
+    def test_reserve_returns_wait(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock)
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == 0.5, (
+            'Проверьте, что сверх бюджета возвращается время ожидания'
+        )
+
+    def test_refill(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        assert bucket.try_acquire(2)
+        assert not bucket.try_acquire()
+        clock.now = 1.0
+        assert bucket.try_acquire(), (
+            'Проверьте, что токены восполняются со временем'
+        )
+
+
+class TestQuotaManager:
+
+    def test_exhausted_token_is_deferred(self):
+        clock = Clock()
+        quota = QuotaManager(rate=10, token_rate=0.5, clock=clock)
+        assert quota.reserve('a') == (0, False)
+        wait, deferred = quota.reserve('a')
+        assert deferred and wait == 2.0, (
+            'Проверьте, что опрос сверх бюджета токена переносится'
+        )
+        assert quota.reserve('b') == (0, False), (
+            'Проверьте, что бюджет одного токена не тратит бюджет другого'
+        )
+        assert quota.deferred['a'] == 1
+        assert quota.utilization() == {'a': 1.0, 'b': 1.0}
+
+    def test_throttled_halves_and_recovers(self):
+        clock = Clock()
+        quota = QuotaManager(rate=10, token_rate=1, clock=clock)
+        quota.throttled('a')
+        assert quota.bucket.rate == 5.0, (
+            'Проверьте, что после 429 общая скорость снижается вдвое'
+        )
+        for _ in range(10):
+            quota.throttled('a')
+        assert quota.bucket.rate == 1.0, (
+            'Проверьте, что скорость не падает ниже MIN_RATE_SHARE'
+        )
+        for _ in range(20):
+            quota.succeeded()
+        assert quota.bucket.rate == 10, (
+            'Проверьте, что скорость возвращается к пределу шагами'
+        )
+
+    def test_retry_after_pauses_token(self):
+        clock = Clock()
+        quota = QuotaManager(rate=10, token_rate=1, clock=clock)
+        quota.throttled('a', retry_after=5)
+        wait, deferred = quota.reserve('a')
+        assert deferred and wait == 5.0, (
+            'Проверьте, что Retry-After откладывает опросы токена'
+        )
+
+    def test_configure_keeps_throttling(self):
+        clock = Clock()
+        quota = QuotaManager(rate=10, token_rate=1, clock=clock)
+        quota.throttled('a', retry_after=5)
+        quota.configure(rate=20, token_rate=2)
+        assert quota.bucket.rate == 10.0, (
+            'Проверьте, что перезагрузка настроек не снимает торможения'
+        )
+        wait, deferred = quota.reserve('a')
+        assert deferred and wait == 2.5, (
+            'Проверьте, что пауза Retry-After переживает перезагрузку'
+        )
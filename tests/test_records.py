@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from records import Homework, Status
+
+
+class TestHomeworkRecord:
+
+    def test_from_dict(self):
+        record = Homework.from_dict({
+            'id': 1,
+            'homework_name': 'hw',
+            'status': 'rejected',
+            'reviewer_comment': 'Есть замечания',
+            'date_updated': '2021-10-12T14:40:57Z',
+        })
+        assert record.status is Status.REJECTED
+        assert record.name == 'hw' and record.id == 1
+        assert not hasattr(record, '__dict__'), (
+            'Проверьте, что запись о работе использует __slots__'
+        )
+
+    def test_validation_errors(self):
+        with pytest.raises(KeyError):
+            Homework.from_dict({'status': 'unknown'})
+        with pytest.raises(ValueError):
+            Homework.from_dict({'homework_name': 'hw', 'status': 'unknown'})
+
+    def test_status_is_plain_string_for_json(self):
+        assert json.dumps({'hw': Status.APPROVED}) == '{"hw": "approved"}'
+        assert Status.APPROVED == 'approved'
+
+    def test_collapse_keeps_latest_status(self):
+        from records import collapse
+
+        records = [
+            Homework('hw1', Status.REVIEWING, 1, '2021-10-01T10:00:00Z'),
+            Homework('hw2', Status.APPROVED, 2, '2021-10-02T10:00:00Z'),
+            Homework('hw1', Status.APPROVED, 1, '2021-10-03T10:00:00Z'),
+        ]
+        assert [(record.name, record.status) for record in collapse(
+            records)] == [('hw2', Status.APPROVED), ('hw1', Status.APPROVED)], (
+            'Проверьте, что промежуточные статусы работы сворачиваются'
+        )
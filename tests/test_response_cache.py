@@ -0,0 +1,87 @@
+import json
+
+from response_cache import CachingSession
+from utils import Clock
+
+
+class Response:
+    parsed = 0
+
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode()
+        self.headers = headers or {}
+        self.data = data
+
+    def json(self):
+        Response.parsed += 1
+        return self.data
+
+
+class Session:
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+class TestCachingSession:
+    data = {'homeworks': [], 'current_date': 1}
+    headers = {'Authorization': 'OAuth token'}
+    params = {'from_date': 0}
+
+    def test_ttl_hit_skips_network(self):
+        clock = Clock()
+        session = Session([Response(200, self.data)])
+        cache = CachingSession(session, ttl=30, clock=clock)
+        first = cache.get('url', headers=self.headers, params=self.params)
+        second = cache.get('url', headers=self.headers, params=self.params)
+        assert second is first and len(session.requests) == 1, (
+            'Проверьте, что повторный запрос в пределах ttl не уходит в сеть'
+        )
+        assert cache.hit_rate() == 0.5
+
+    def test_not_modified_and_same_body(self):
+        clock = Clock()
+        session = Session([
+            Response(200, self.data, {'ETag': '"v1"'}),
+            Response(304),
+            Response(200, self.data),
+        ])
+        cache = CachingSession(session, ttl=1, clock=clock, retention=60)
+        first = cache.get('url', headers=self.headers, params=self.params)
+        Response.parsed = 0
+        first.json()
+        clock.now = 5
+        assert cache.get(
+            'url', headers=self.headers, params=self.params) is first
+        assert session.requests[1]['If-None-Match'] == '"v1"', (
+            'Проверьте, что отправляется условный запрос с ETag'
+        )
+        clock.now = 10
+        third = cache.get('url', headers=self.headers, params=self.params)
+        assert third.json() == self.data and Response.parsed == 1, (
+            'Проверьте, что тело с тем же хешем не разбирается повторно'
+        )
+
+    def test_errors_are_not_cached(self):
+        session = Session([Response(500, {}), Response(200, self.data)])
+        cache = CachingSession(session, clock=Clock())
+        assert cache.get('url', params=self.params).status_code == 500
+        assert cache.get('url', params=self.params).status_code == 200
+
+    def test_expired_entries_are_dropped(self):
+        clock = Clock()
+        session = Session([
+            Response(200, self.data), Response(200, self.data)])
+        cache = CachingSession(session, ttl=30, clock=clock)
+        cache.get('url', headers=self.headers, params={'from_date': 0})
+        clock.now = 31
+        cache.get('url', headers=self.headers, params={'from_date': 1})
+        assert len(cache.entries) == 1, (
+            'Проверьте, что ответы старше ttl удаляются из кэша'
+        )
@@ -0,0 +1,64 @@
+from scheduler import AdaptivePolicy, Cadence, DeadlineQueue
+
+
+class TestAdaptivePolicy:
+    policy = AdaptivePolicy(600, 60, 3600, jitter=0, rand=lambda: 0.5)
+
+    def test_reviewing_polls_fast(self):
+        assert self.policy.delay(Cadence(), reviewing=True) == 60, (
+            'Проверьте, что работа на ревью опрашивается чаще'
+        )
+
+    def test_idle_backoff_is_capped(self):
+        cadence = Cadence()
+        delays = []
+        for _ in range(4):
+            delays.append(self.policy.delay(cadence, reviewing=False))
+            cadence.record_success(changed=False)
+        assert delays == [600, 1200, 2400, 3600], (
+            'Проверьте, что без изменений задержка растёт до потолка'
+        )
+        cadence.record_success(changed=True)
+        assert self.policy.delay(cadence, reviewing=False) == 600
+
+    def test_failures_back_off_even_when_reviewing(self):
+        cadence = Cadence()
+        cadence.record_failure()
+        cadence.record_failure()
+        assert self.policy.delay(cadence, reviewing=True) == 1200, (
+            'Проверьте, что при ошибках API опрос замедляется'
+        )
+
+    def test_jitter_bounds(self):
+        policy = AdaptivePolicy(600, 60, 3600, jitter=0.1, rand=lambda: 1)
+        assert policy.delay(Cadence(), reviewing=False) == 660
+
+
+class TestDeadlineQueue:
+
+    def test_pop_only_due(self):
+        queue = DeadlineQueue()
+        queue.schedule('a', 'A', due=10)
+        queue.schedule('b', 'B', due=5)
+        queue.schedule('c', 'C', due=20)
+        assert queue.pop_due(now=10) == ['B', 'A'], (
+            'Проверьте, что извлекаются только наступившие сроки по порядку'
+        )
+        assert len(queue) == 1
+        assert queue.wait_time(now=15) == 5
+
+    def test_reschedule_replaces_deadline(self):
+        queue = DeadlineQueue()
+        queue.schedule('a', 'A', due=5)
+        queue.schedule('a', 'A', due=50)
+        assert queue.pop_due(now=10) == [], (
+            'Проверьте, что перенос срока отменяет прежний срок'
+        )
+        assert len(queue) == 1
+        assert queue.next_due() == 50
+
+    def test_lag(self):
+        queue = DeadlineQueue()
+        assert queue.lag(now=100) == 0
+        queue.schedule('a', 'A', due=90)
+        assert queue.lag(now=100) == 10
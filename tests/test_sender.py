@@ -0,0 +1,89 @@
+import telegram
+
+from sender import FAILED, QUEUED, SENT, SendQueue, take_batch
+from utils import Bot
+
+
+class TestSendQueue:
+
+    def test_coalesces_messages_of_one_chat(self):
+        bot = Bot()
+        queue = SendQueue(bot, sleep=lambda seconds: None)
+        queue.put(1, 'first')
+        queue.put(2, 'other')
+        queue.put(1, 'second')
+        queue.start()
+        queue.stop(timeout=5)
+        assert bot.sent == [(1, 'first\n\nsecond'), (2, 'other')], (
+            'Проверьте, что сообщения одного чата склеиваются в одно'
+        )
+
+    def test_retry_after_requeues(self):
+        bot = Bot(failures=[telegram.error.RetryAfter(3)])
+        pauses = []
+        queue = SendQueue(bot, sleep=pauses.append)
+        queue.put(1, 'text')
+        queue.start()
+        queue.stop(timeout=5)
+        assert bot.sent == [(1, 'text')], (
+            'Проверьте, что после 429 сообщение отправляется повторно'
+        )
+        assert 3 in pauses, 'Проверьте, что соблюдается retry_after'
+
+    def test_take_batch_respects_limit(self):
+        batch, count = take_batch(['a' * 3, 'b' * 3, 'c' * 3], limit=8)
+        assert (batch, count) == ('aaa\n\nbbb', 2)
+
+    def test_each_delivery_has_outcome(self):
+        bot = Bot(failures=[telegram.error.BadRequest('chat not found')])
+        queue = SendQueue(bot, sleep=lambda seconds: None)
+        failed = queue.put(1, 'text')
+        sent = queue.put(2, 'text')
+        queue.start()
+        queue.stop(timeout=5)
+        assert (failed.status, sent.status) == (FAILED, SENT), (
+            'Проверьте, что итог доставки учитывается для каждого чата'
+        )
+        assert queue.outcomes == {FAILED: 1, SENT: 1}
+
+    def test_network_errors_are_retried(self):
+        bot = Bot(failures=[
+            telegram.error.NetworkError('down'), telegram.error.TimedOut()])
+        pauses = []
+        queue = SendQueue(bot, 1000, 1000, sleep=pauses.append)
+        queue.running = True
+        delivery = queue.put(1, 'text')
+        for _ in range(3):
+            queue.deliver(1)
+        assert delivery.status == SENT and bot.sent == [(1, 'text')], (
+            'Проверьте, что после сетевого сбоя сообщение не теряется'
+        )
+        assert [pause for pause in pauses if pause >= 1] == [1, 2], (
+            'Проверьте, что пауза между повторами растёт'
+        )
+
+    def test_network_error_on_stop_stays_in_outbox(self, tmp_path):
+        from outbox import Outbox
+
+        outbox = Outbox(str(tmp_path / 'outbox.db'))
+        outbox.add('tenant', [('key', 1, 'text')])
+        queue = SendQueue(
+            Bot(failures=[telegram.error.NetworkError('down')]),
+            sleep=lambda seconds: None, outbox=outbox)
+        delivery = queue.put(1, 'text', 'key')
+        queue.deliver(1)
+        assert delivery.status == QUEUED and len(queue) == 0
+        assert outbox.pending() == [('key', 1, 'text')], (
+            'Проверьте, что временный сбой не помечает запись failed'
+        )
+
+    def test_unexpected_error_keeps_thread_alive(self):
+        bot = Bot(failures=[RuntimeError('outbox is locked')])
+        queue = SendQueue(bot, sleep=lambda seconds: None)
+        queue.put(1, 'lost')
+        queue.put(2, 'text')
+        queue.start()
+        queue.stop(timeout=5)
+        assert bot.sent == [(2, 'text')], (
+            'Проверьте, что ошибка одной пачки не останавливает отправку'
+        )
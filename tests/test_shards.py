@@ -0,0 +1,72 @@
+import multiprocessing
+import time
+
+from shards import HashRing, Supervisor, select_shard
+from tenants import Tenant
+
+
+def crash(shard, shards):
+    raise SystemExit(3)
+
+
+class TestShards:
+
+    def test_ring_spreads_and_moves_few_keys(self):
+        keys = [f'key-{index}' for index in range(2000)]
+        four = HashRing(4)
+        five = HashRing(5)
+        owners = [four.shard_of(key) for key in keys]
+        assert set(owners) == {0, 1, 2, 3}
+        assert min(owners.count(shard) for shard in range(4)) > 300, (
+            'Проверьте, что ключи распределяются по всем шардам'
+        )
+        moved = sum(four.shard_of(key) != five.shard_of(key) for key in keys)
+        assert moved < len(keys) * 0.35, (
+            'Проверьте, что при добавлении шарда переезжает малая часть ключей'
+        )
+        assert all(
+            five.shard_of(key) == 4
+            for key in keys if four.shard_of(key) != five.shard_of(key)), (
+            'Проверьте, что ключи переезжают только на новый шард'
+        )
+
+    def test_select_shard_partitions_tenants(self):
+        tenants = [Tenant(f'token-{index}') for index in range(50)]
+        parts = [select_shard(tenants, shard, 3) for shard in range(3)]
+        assert sum(len(part) for part in parts) == 50
+        assert len({tenant.key for part in parts for tenant in part}) == 50
+
+    def test_crashed_worker_restarts(self):
+        supervisor = Supervisor(
+            crash, 2, restart_delay=0,
+            context=multiprocessing.get_context('fork'))
+        supervisor.start()
+        try:
+            first = {shard: process.pid
+                     for shard, process in supervisor.workers.items()}
+            for process in list(supervisor.workers.values()):
+                process.join(5)
+            supervisor.reap(time.monotonic())
+            assert supervisor.restarts == {0: 1, 1: 1}
+            assert sorted(supervisor.workers) == [0, 1], (
+                'Проверьте, что упавший шард перезапускается'
+            )
+            assert all(supervisor.workers[shard].pid != pid
+                       for shard, pid in first.items())
+        finally:
+            supervisor.stop()
+
+    def test_single_supervised_shard_keeps_partition(
+            self, tmp_path, monkeypatch):
+        import homework
+        from checkpoint import PartitionCheckpoint
+
+        monkeypatch.setattr(
+            homework, 'CHECKPOINT_FILE', str(tmp_path / 'checkpoint.json'))
+        checkpoint = homework.open_checkpoint([Tenant('token')], 0, shard=0)
+        assert isinstance(checkpoint, PartitionCheckpoint), (
+            'Проверьте, что шард под супервизором пишет свой раздел'
+        )
+        assert not isinstance(
+            homework.open_checkpoint([Tenant('token')], 0),
+            PartitionCheckpoint)
@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup:
+
+    def test_import_skips_network_libraries(self):
+        probe = (
+            'import sys, json, homework; '
+            "print(json.dumps(sorted({'telegram', 'requests'} "
+            '& set(sys.modules))))'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', probe], cwd=ROOT,
+            capture_output=True, text=True, check=True)
+        assert json.loads(result.stdout) == [], (
+            'Проверьте, что telegram и requests импортируются только '
+            'при первом обращении к сети'
+        )
@@ -0,0 +1,37 @@
+from records import Homework, Status
+from status_cache import StatusIndex
+
+
+def record(name, status):
+    return Homework.from_dict({'homework_name': name, 'status': status})
+
+
+class TestStatusIndex:
+
+    def test_only_transitions_are_changes(self):
+        index = StatusIndex()
+        homework = record('hw', 'reviewing')
+        assert index.changes([homework]) == [homework]
+        index.remember(homework)
+        assert index.changes([homework]) == [], (
+            'Проверьте, что повторный статус не считается изменением'
+        )
+        approved = record('hw', 'approved')
+        assert index.changes([approved]) == [approved], (
+            'Проверьте, что смена статуса считается изменением'
+        )
+
+    def test_key_is_homework_name(self):
+        index = StatusIndex()
+        index.remember(record('hw', 'approved'))
+        assert index.get('hw') is Status.APPROVED
+
+    def test_lru_eviction(self):
+        index = StatusIndex(maxsize=2)
+        for key in ('a', 'b'):
+            index.set(key, Status.APPROVED)
+        index.changed(record('a', 'approved'))
+        index.set('c', Status.APPROVED)
+        assert list(index.to_dict()) == ['a', 'c'], (
+            'Проверьте, что вытесняется давно не встречавшаяся работа'
+        )
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from stream import HomeworkStream
+
+
+def chunked(data, size):
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestHomeworkStream:
+    data = {
+        'homeworks': [
+            {'homework_name': 'Работа 1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'reviewing', 'id': 123456},
+        ],
+        'current_date': 1634074965,
+    }
+
+    @pytest.mark.parametrize('size', [1, 2, 3, 7, 4096])
+    def test_records_and_meta(self, size):
+        stream = HomeworkStream(chunked(self.data, size))
+        assert list(stream) == self.data['homeworks'], (
+            'Проверьте, что работы разбираются при любом размере кусков'
+        )
+        assert stream.meta == {'current_date': 1634074965}
+        assert stream.has_homeworks
+
+    def test_homeworks_not_list_goes_to_meta(self):
+        stream = HomeworkStream(chunked({'homeworks': {}}, 3))
+        assert list(stream) == []
+        assert not stream.has_homeworks and stream.meta == {'homeworks': {}}
+
+    def test_not_object(self):
+        with pytest.raises(TypeError):
+            list(HomeworkStream(chunked([self.data], 5)))
+
+    def test_stream_api_keeps_only_filtered(self):
+        import homework
+
+        data = self.data
+
+        class Response:
+            status_code = 200
+
+            def iter_content(self, size):
+                return chunked(data, 5)
+
+        class Session:
+            def get(self, url, **kwargs):
+                assert kwargs['stream'] is True
+                return Response()
+
+        answer = homework.stream_api(
+            {}, 0, Session(),
+            keep=lambda homework: homework['status'] == 'approved')
+        assert answer == {
+            'homeworks': [data['homeworks'][0]],
+            'current_date': 1634074965,
+        }
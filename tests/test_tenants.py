@@ -0,0 +1,78 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+import pytest
+
+import tenants
+from utils import Bot, DirectSender
+
+
+class TestTenants:
+
+    def test_load_json_tenants(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([
+            {'practicum_token': 'token1', 'chat_id': 1},
+            {'practicum_token': 'token2', 'chat_id': 2},
+            {'practicum_token': 'token1', 'chat_id': 3},
+            {'practicum_token': 'token1', 'chat_id': 3},
+        ]))
+        result = tenants.load_tenants(str(path))
+        chats = [[subscriber.chat_id for subscriber in tenant.subscribers]
+                 for tenant in result]
+        assert chats == [[1, 3], [2]], (
+            'Проверьте, что чаты одного токена собираются в одну подписку'
+        )
+        assert result[0].headers == {'Authorization': 'OAuth token1'}, (
+            'Проверьте, что заголовки подписчика содержат его токен'
+        )
+
+    def test_load_sqlite_tenants(self, tmp_path):
+        path = str(tmp_path / 'tenants.db')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE tenants (practicum_token TEXT, chat_id INTEGER)')
+        connection.execute("INSERT INTO tenants VALUES ('token', 42)")
+        connection.commit()
+        connection.close()
+        result = tenants.load_tenants(path)
+        assert result[0].subscribers[0].chat_id == 42, (
+            'Проверьте, что реестр подписчиков читается из базы SQLite'
+        )
+
+    def test_missing_keys(self, tmp_path):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps([{'chat_id': 1}]))
+        with pytest.raises(KeyError):
+            tenants.load_tenants(str(path))
+
+    def test_poll_tenant_uses_own_chat(self, monkeypatch):
+        import homework
+
+        bot = Bot()
+
+        def mock_request_api(headers, current_timestamp, session=None):
+            assert headers == {'Authorization': 'OAuth token'}
+            return {
+                'homeworks': [{'homework_name': 'hw', 'status': 'approved'}],
+                'current_date': 100,
+            }
+
+        monkeypatch.setattr(homework, 'request_api', mock_request_api)
+
+        async def poll(tenant):
+            semaphore = asyncio.Semaphore(1)
+            sender = DirectSender(bot, semaphore)
+            await homework.async_poll_tenant(semaphore, sender, tenant)
+
+        tenant = tenants.Tenant(
+            'token', [tenants.Subscriber(7)], timestamp=int(time.time()))
+        asyncio.run(poll(tenant))
+        assert bot.sent and bot.sent[0][0] == 7, (
+            'Проверьте, что сообщение уходит в чат подписчика'
+        )
+        assert tenant.timestamp == 100, (
+            'Проверьте, что отметка времени подписчика обновляется'
+        )
@@ -0,0 +1,100 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from messages import render
+from tenants import Subscriber, Tenant
+from webhook import SECRET_HEADER, start_webhook
+
+SECRET = 'webhook-secret'
+
+
+def post(server, path, update, secret=SECRET):
+    headers = {'Content-Type': 'application/json'}
+    if secret is not None:
+        headers[SECRET_HEADER] = secret
+    request = Request(
+        f'http://127.0.0.1:{server.server_address[1]}{path}',
+        data=json.dumps(update).encode(), headers=headers)
+    with urlopen(request) as response:
+        body = response.read()
+    return json.loads(body) if body else None
+
+
+def status_update(chat_id, text='/status'):
+    return {
+        'update_id': 1,
+        'message': {'chat': {'id': chat_id}, 'text': text},
+    }
+
+
+class TestWebhook:
+
+    def test_status_from_cache(self):
+        import homework
+
+        tenant = Tenant('token', [Subscriber(10)])
+        tenant.statuses.set('hw05', 'approved')
+        server = start_webhook(
+            0, '/webhook', [tenant], homework.render_statuses, SECRET,
+            host='127.0.0.1')
+        try:
+            reply = post(server, '/webhook', status_update(10))
+            other = post(server, '/webhook', status_update(99))
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert reply['method'] == 'sendMessage' and reply['chat_id'] == 10
+        assert 'hw05' in reply['text'], (
+            'Проверьте, что /status отвечает последним известным статусом'
+        )
+        assert homework.VERDICTS['approved'] in reply['text']
+        assert other is None, (
+            'Проверьте, что незнакомому чату статусы не раскрываются'
+        )
+
+    def test_requires_secret(self):
+        import homework
+
+        tenant = Tenant('token', [Subscriber(10)])
+        tenant.statuses.set('hw05', 'approved')
+        server = start_webhook(
+            0, '/webhook', [tenant], homework.render_statuses, SECRET,
+            host='127.0.0.1')
+        try:
+            for secret in (None, 'guess'):
+                with pytest.raises(HTTPError) as error:
+                    post(server, '/webhook', status_update(10), secret)
+                assert error.value.code == 403, (
+                    'Проверьте, что вебхук отклоняет запросы без секрета'
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+        with pytest.raises(ValueError):
+            start_webhook(0, '/webhook', [tenant], homework.render_statuses,
+                          None, host='127.0.0.1')
+
+    def test_secret_is_required_to_start(self, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, 'WEBHOOK_PORT', '8443')
+        monkeypatch.setattr(homework, 'WEBHOOK_SECRET', None)
+        monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', 'telegram')
+        monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'practicum')
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '1')
+        assert not homework.check_tokens(), (
+            'Проверьте, что вебхук без WEBHOOK_SECRET не запускается'
+        )
+
+    def test_empty_cache(self):
+        import homework
+
+        assert homework.render_statuses([Tenant('token')]) == (
+            render('status_unknown', 'ru')
+        )
+        assert homework.render_statuses([Tenant('token')], 'en') == (
+            render('status_unknown', 'en')
+        )
@@ -1,3 +1,4 @@
+import asyncio
 from inspect import signature
 from types import ModuleType
 
@@ -37,3 +38,48 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+
+class Clock:
+    """Manually advanced clock for time-dependent tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Bot:
+    """Telegram bot stub; raises queued failures before sending."""
+
+    def __init__(self, failures=()):
+        self.sent = []
+        self.failures = list(failures)
+
+    def send_message(self, chat_id, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((chat_id, text))
+
+
+class DirectSender:
+    """Sends messages inline instead of through the SendQueue thread."""
+
+    def __init__(self, bot, semaphore):
+        self.bot = bot
+        self.semaphore = semaphore
+
+    async def send(self, chat_id, message, key=None):
+        import homework
+        from sender import FAILED, SENT, Delivery
+
+        delivery = Delivery(chat_id, message, key)
+        sent = await homework.run_limited(
+            self.semaphore, homework.send_to_chat, self.bot, chat_id, message)
+        delivery.finish(SENT if sent else FAILED)
+        return delivery
+
+    async def send_all(self, tenant_key, entries):
+        return await asyncio.gather(*(
+            self.send(chat_id, text, key) for key, chat_id, text in entries))
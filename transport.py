@@ -0,0 +1,40 @@
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = frozenset({'GET'})
+
+
+def make_retry(retries, backoff):
+    """Политика повторов для идемпотентных запросов."""
+    from urllib3.util.retry import Retry
+
+    return Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+
+
+def make_session(pool_size, retries=3, backoff=0.5, headers=None,
+                 hosts=1):
+    """Сессия с пулом keep-alive соединений.
+
+    hosts - число хостов, для которых держатся пулы,
+    pool_size - предел соединений к одному хосту. requests импортируется
+    здесь, чтобы запуск бота до первой сессии его не ждал.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=hosts,
+        pool_maxsize=pool_size,
+        pool_block=True,
+        max_retries=make_retry(retries, backoff),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
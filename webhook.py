@@ -0,0 +1,119 @@
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from logs import Lazy
+
+STATUS_COMMAND = '/status'
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+UPDATE_FAIL = 'Некорректное обновление Telegram: {0}.'
+FORBIDDEN = 'Запрос к вебхуку без секрета Telegram.'
+WEBHOOK_STARTED = 'Вебхук слушает порт {0}.'
+
+logger = logging.getLogger(__name__)
+
+
+def command_of(update):
+    """Чат и команда из обновления Telegram; None, если это не текст."""
+    message = update.get('message') or update.get('edited_message')
+    if not isinstance(message, dict) or 'text' not in message:
+        return None
+    return message['chat']['id'], message['text'].split('@')[0].strip()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Приём обновлений Telegram по POST с секретом в заголовке."""
+
+    def do_POST(self):
+        """Ответ на команду прямо в теле ответа вебхука."""
+        if self.path != self.server.path:
+            self.send_error(404)
+            return
+        if not self.server.authorized(self.headers.get(SECRET_HEADER, '')):
+            logger.warning(FORBIDDEN)
+            self.send_error(403)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            update = json.loads(self.rfile.read(length))
+            reply = self.server.answer(update)
+        except (ValueError, KeyError, TypeError) as error:
+            logger.warning(Lazy(UPDATE_FAIL, error))
+            self.send_error(400)
+            return
+        body = json.dumps(reply, ensure_ascii=False).encode() if reply else b''
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Журнал запросов через logging вместо stderr."""
+        logger.debug(format, *args)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """HTTP-сервер вебхука, отвечающий из кэша последних статусов.
+
+    chats - словарь {str(chat_id): (локаль, [токены чата])}, render -
+    функция render(tenants, locale), собирающая текст ответа. API
+    Практикума при этом не запрашивается. Ответ со статусами получает
+    только запрос с секретом secret в заголовке SECRET_HEADER: его
+    Telegram передаёт, если secret_token указан в setWebhook.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, path, chats, render, secret):
+        """Сервер на address, принимающий обновления по пути path."""
+        if not secret:
+            raise ValueError(FORBIDDEN)
+        super().__init__(address, WebhookHandler)
+        self.path = path
+        self.chats = chats
+        self.render = render
+        self.secret = secret
+
+    def authorized(self, secret):
+        """Совпадает ли секрет запроса с секретом вебхука."""
+        return hmac.compare_digest(secret.encode(), self.secret.encode())
+
+    def answer(self, update):
+        """Ответ вебхука в формате метода Bot API или None."""
+        command = command_of(update)
+        if command is None:
+            return None
+        chat_id, text = command
+        chat = self.chats.get(str(chat_id))
+        if text != STATUS_COMMAND or chat is None:
+            return None
+        locale, tenants = chat
+        return {
+            'method': 'sendMessage',
+            'chat_id': chat_id,
+            'text': self.render(tenants, locale),
+        }
+
+
+def group_by_chat(tenants):
+    """Локаль и токены каждого чата-подписчика."""
+    chats = {}
+    for tenant in tenants:
+        for subscriber in tenant.subscribers:
+            locale, chat_tenants = chats.setdefault(
+                str(subscriber.chat_id), (subscriber.locale, []))
+            chat_tenants.append(tenant)
+    return chats
+
+
+def start_webhook(port, path, tenants, render, secret, host=''):
+    """Запуск сервера вебхука в фоновом потоке."""
+    server = WebhookServer(
+        (host, port), path, group_by_chat(tenants), render, secret)
+    threading.Thread(
+        target=server.serve_forever, name='webhook', daemon=True).start()
+    logger.info(Lazy(WEBHOOK_STARTED, server.server_address[1]))
+    return server